@@ -1,12 +1,18 @@
-import json
+import gzip
 import os
+import re
 import sys
 import traceback
-from typing import Tuple
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
 
 import flask
+import orjson
 from flask import send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import werkzeug.exceptions
+from werkzeug.routing import BaseConverter
 import pygit2
 import datetime
 import logging
@@ -16,15 +22,39 @@ from opentelemetry.instrumentation.flask import FlaskInstrumentor
 from opentelemetry import trace
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import plover
 
 SCRIPT_DIR = f"{os.path.dirname(os.path.abspath(__file__))}"
+MAX_BODY_BYTES = int(os.environ.get("PLOVER_MAX_BODY_BYTES", 64 * 1024 * 1024))  # Default is 64 MiB
+MIN_BYTES_TO_COMPRESS = 16 * 1024
+GZIP_COMPRESSION_LEVEL = 5  # Favor speed over size a bit; TRAPI JSON is very redundant either way
+RESPONSE_CACHE_SIZE = 512  # Max number of answers to keep in each (per-worker) response cache
+# Max total bytes of answers to keep in each (per-worker) response cache; bigger answers than a quarter of this are
+# never cached, since one of them would push out many smaller ones
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("PLOVER_RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+ENDPOINT_NOT_FOUND_MESSAGE = "404 ERROR: Endpoint specified in request ('/%s') does not exist"
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Serializes/parses request and response JSON with orjson, which is much faster than the standard json module for
+    large TRAPI messages. Anything orjson doesn't handle natively (e.g., datetimes in TRAPI logs) is converted the same
+    way Flask's default provider does it.
+    """
+    def dumps(self, obj: any, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s: any, **kwargs) -> any:
+        return orjson.loads(s)
+
 
 app = flask.Flask(__name__)
+app.json = ORJSONProvider(app)
 cors = CORS(app)
 
 logging.basicConfig(level=logging.INFO,
@@ -80,84 +110,262 @@ def instrument(flask_app):
             ResourceAttributes.SERVICE_NAME: service_name
         })
     ))
+    # Batch span exports in a background thread, rather than blocking each request on a send to jaeger
+    # (jaeger accepts OTLP natively on port 4317). Note: We're still in the uwsgi master here; uwsgi.ini's
+    # enable-threads and py-call-osafterfork settings let the processor restart its export thread in each forked worker.
     trace.get_tracer_provider().add_span_processor(
-        SimpleSpanProcessor(
-            JaegerExporter(
-                        agent_host_name=jaeger_host,
-                        agent_port=6831
-            )
+        BatchSpanProcessor(
+            OTLPSpanExporter(
+                        endpoint=f"http://{jaeger_host}:4317",
+                        insecure=True
+            ),
+            max_queue_size=2048,
+            schedule_delay_millis=5000
         )
     )
-    tracer_provider = trace.get_tracer(__name__)
-    FlaskInstrumentor().instrument_app(app=flask_app, tracer_provider=trace, excluded_urls="docs,get_logs,code_version")
+    # Don't trace probes/static pages (the '$' patterns match the KP home pages, e.g., '/kg2c', only)
+    excluded_urls = ["docs", "get_logs", "code_version", "healthcheck", "meta_knowledge_graph", "sri_test_triples"] + \
+                    [f"/{endpoint_name}$" for endpoint_name in plover_objs_map]
+    FlaskInstrumentor().instrument_app(app=flask_app, tracer_provider=trace.get_tracer_provider(),
+                                       excluded_urls=",".join(excluded_urls))
 
 
 instrument(app)
 
 
-@app.post("/<kp_endpoint_name>/query")
-@app.post("/query")
-def run_query(kp_endpoint_name: str = default_endpoint_name):
-    if kp_endpoint_name in plover_objs_map:
-        query = flask.request.json
-        logging.info(f"{kp_endpoint_name}: Received a TRAPI query")
-        answer = plover_objs_map[kp_endpoint_name].answer_query(query)
-        return flask.jsonify(answer)
-    else:
-        flask.abort(404, f"404 ERROR: Endpoint specified in request ('/{kp_endpoint_name}') does not exist")
-
-
-@app.post("/<kp_endpoint_name>/get_edges")
-@app.post("/get_edges")
-def get_edges(kp_endpoint_name: str = default_endpoint_name):
-    if kp_endpoint_name in plover_objs_map:
-        query = flask.request.json
-        pairs = query['pairs']
-        logging.info(f"{kp_endpoint_name}: Received a query to get edges for {len(pairs)} node pairs")
-        answer = plover_objs_map[kp_endpoint_name].get_edges(pairs)
-        return flask.jsonify(answer)
+@app.before_request
+def reject_bad_post_requests():
+    # Reject obviously bad POST requests up front, before we spend any time parsing or answering them (requests that
+    # didn't match a route are left alone, so they still get a 404 from handle_not_found())
+    if flask.request.method == "POST" and flask.request.url_rule is not None:
+        content_length = flask.request.content_length
+        if content_length is not None and content_length > MAX_BODY_BYTES:
+            flask.abort(413, f"413 ERROR: Request body is {content_length} bytes; max allowed is {MAX_BODY_BYTES}")
+        if not flask.request.is_json:
+            flask.abort(415, f"415 ERROR: Request body must be JSON (Content-Type: application/json)")
+
+
+def load_request_body(required_properties: Dict[str, Tuple[Callable[[any], bool], str]]) -> dict:
+    # Maps each required property to a function that checks its value, plus a description of what's expected
+    body = flask.request.get_json(silent=True)
+    if not isinstance(body, dict):
+        flask.abort(400, "400 ERROR: Request body must be a JSON object")
+    for property_name, (is_valid, description) in required_properties.items():
+        if not is_valid(body.get(property_name)):
+            flask.abort(400, f"400 ERROR: Request body must include a '{property_name}' property that is "
+                             f"{description}")
+    return body
+
+
+def is_list_of_strings(items: any) -> bool:
+    return isinstance(items, list) and all(isinstance(item, str) for item in items)
+
+
+def is_list_of_string_pairs(items: any) -> bool:
+    return isinstance(items, list) and all(is_list_of_strings(item) and len(item) == 2 for item in items)
+
+
+def is_string_or_list_of_strings(items: any) -> bool:
+    return isinstance(items, str) or is_list_of_strings(items)
+
+
+class ResponseCache:
+    """
+    Recently computed answers (as serialized JSON, plus its gzipped form for large answers), keyed by their request.
+    Bounded both by number of answers and by their total size, since a single answer can be many MB.
+    """
+    def __init__(self):
+        self.responses = OrderedDict()
+        self.num_bytes = 0
+
+
+get_edges_cache = ResponseCache()
+get_neighbors_cache = ResponseCache()
+
+
+def get_cached_json_response(cache: ResponseCache, cache_key: Hashable,
+                             get_answer: Callable[[], dict]) -> flask.Response:
+    # Answers can't go stale since our indexes are fixed once loaded; evict least recently used answers when full
+    if cache_key in cache.responses:
+        cache.responses.move_to_end(cache_key)
+        response_data, response_data_gzipped = cache.responses[cache_key]
+        cache_status = "HIT"
     else:
-        flask.abort(404, f"404 ERROR: Endpoint specified in request ('/{kp_endpoint_name}') does not exist")
-
-
-@app.post("/<kp_endpoint_name>/get_neighbors")
-@app.post("/get_neighbors")
-def get_neighbors(kp_endpoint_name: str = default_endpoint_name):
-    if kp_endpoint_name in plover_objs_map:
-        query = flask.request.json
-        node_ids = query["node_ids"]
-        categories = query.get("categories", ["biolink:NamedThing"])
-        predicates = query.get("predicates", ["biolink:related_to"])
-        logging.info(f"{kp_endpoint_name}: Received a query to get neighbors for {len(node_ids)} nodes")
-        answer = plover_objs_map[kp_endpoint_name].get_neighbors(node_ids, categories, predicates)
-        return flask.jsonify(answer)
+        response_data = flask.jsonify(get_answer()).get_data()
+        response_data_gzipped = None
+        if len(response_data) <= RESPONSE_CACHE_MAX_BYTES // 4:
+            # We compress answers we cache up front, so that cache hits don't have to redo it in compress_response()
+            if len(response_data) >= MIN_BYTES_TO_COMPRESS:
+                response_data_gzipped = gzip.compress(response_data, compresslevel=GZIP_COMPRESSION_LEVEL)
+            cache.responses[cache_key] = (response_data, response_data_gzipped)
+            cache.num_bytes += get_num_cached_bytes(response_data, response_data_gzipped)
+            while len(cache.responses) > RESPONSE_CACHE_SIZE or cache.num_bytes > RESPONSE_CACHE_MAX_BYTES:
+                _, evicted_responses = cache.responses.popitem(last=False)
+                cache.num_bytes -= get_num_cached_bytes(*evicted_responses)
+        cache_status = "MISS"
+    response = get_json_response(response_data, response_data_gzipped)
+    response.headers["X-Cache"] = cache_status
+    return response
+
+
+def get_num_cached_bytes(response_data: bytes, response_data_gzipped: Optional[bytes]) -> int:
+    return len(response_data) + (len(response_data_gzipped) if response_data_gzipped else 0)
+
+
+def get_json_response(response_data: bytes, response_data_gzipped: Optional[bytes]) -> flask.Response:
+    # Serves already-gzipped bytes (if we have them) to clients that accept gzip; compress_response() leaves those be
+    if response_data_gzipped is not None and accepts_gzip():
+        response = flask.Response(response_data_gzipped, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+        return response
     else:
-        flask.abort(404, f"404 ERROR: Endpoint specified in request ('/{kp_endpoint_name}') does not exist")
+        return flask.Response(response_data, mimetype="application/json")
 
 
-@app.get("/<kp_endpoint_name>/sri_test_triples")
-@app.get("/sri_test_triples")
-def get_sri_test_triples(kp_endpoint_name: str = default_endpoint_name):
-    if kp_endpoint_name in plover_objs_map:
-        with open(plover_objs_map[kp_endpoint_name].sri_test_triples_path, "r") as sri_test_file:
-            sri_test_triples = json.load(sri_test_file)
-        return flask.jsonify(sri_test_triples)
-    else:
-        flask.abort(404, f"404 ERROR: Endpoint specified in request ('/{kp_endpoint_name}') does not exist")
+def get_sorted_tuple(items: any) -> tuple:
+    # Categories/predicates may be given as a single string or as a list of strings
+    return tuple(sorted(items)) if isinstance(items, list) else (items,)
 
 
-@app.get("/<kp_endpoint_name>/meta_knowledge_graph")
-@app.get("/meta_knowledge_graph")
-def get_meta_knowledge_graph(kp_endpoint_name: str = default_endpoint_name):
-    if kp_endpoint_name in plover_objs_map:
-        return flask.jsonify(plover_objs_map[kp_endpoint_name].meta_kg)
-    else:
-        flask.abort(404, f"404 ERROR: Endpoint specified in request ('/{kp_endpoint_name}') does not exist")
+def run_query(kp_endpoint_name: str):
+    query = load_request_body(dict())
+    logging.info("%s: Received a TRAPI query (%s bytes)", kp_endpoint_name, flask.request.content_length)
+    answer = plover_objs_map[kp_endpoint_name].answer_query(query)
+    return flask.jsonify(answer)
+
+
+def get_edges(kp_endpoint_name: str):
+    query = load_request_body({"pairs": (is_list_of_string_pairs, "a list of [node ID, node ID] pairs")})
+    pairs = query['pairs']
+    logging.info("%s: Received a query to get edges for %s node pairs", kp_endpoint_name, len(pairs))
+    # Note: We don't sort pairs in the key, since the answer lists pairs in the order they were requested
+    cache_key = (kp_endpoint_name, tuple(map(tuple, pairs)))
+    return get_cached_json_response(get_edges_cache, cache_key,
+                                    lambda: plover_objs_map[kp_endpoint_name].get_edges(pairs))
+
+
+def get_neighbors(kp_endpoint_name: str):
+    query = load_request_body({"node_ids": (is_list_of_strings, "a list of node IDs (strings)")})
+    node_ids = query["node_ids"]
+    categories = query.get("categories", ["biolink:NamedThing"])
+    predicates = query.get("predicates", ["biolink:related_to"])
+    if not (is_string_or_list_of_strings(categories) and is_string_or_list_of_strings(predicates)):
+        flask.abort(400, "400 ERROR: 'categories' and 'predicates' must each be a string or a list of strings")
+    logging.info("%s: Received a query to get neighbors for %s nodes", kp_endpoint_name, len(node_ids))
+    # Note: We don't sort node IDs in the key, since the answer lists nodes in the order they were requested
+    cache_key = (kp_endpoint_name, tuple(node_ids), get_sorted_tuple(categories), get_sorted_tuple(predicates))
+    return get_cached_json_response(get_neighbors_cache, cache_key,
+                                    lambda: plover_objs_map[kp_endpoint_name].get_neighbors(node_ids, categories,
+                                                                                            predicates))
+
+
+def get_sri_test_triples(kp_endpoint_name: str):
+    # This file is static once built, so let clients revalidate it (and get a 304 back) via ETag/If-Modified-Since
+    return send_file(plover_objs_map[kp_endpoint_name].sri_test_triples_path, mimetype="application/json",
+                     conditional=True, etag=True)
+
+
+def get_meta_knowledge_graph(kp_endpoint_name: str):
+    # The meta KG never changes, so we serve bytes that were serialized/compressed once at startup
+    return get_json_response(*meta_kg_responses_map[kp_endpoint_name])
 
 
-@app.get("/healthcheck")
-def run_health_check():
-    return ""
+def get_home_page(kp_endpoint_name: str):
+    logging.info("%s: Going to homepage.", kp_endpoint_name)
+    return send_file(plover_objs_map[kp_endpoint_name].home_html_path, as_attachment=False)
+
+
+class KPEndpointConverter(BaseConverter):
+    """
+    URL converter that only matches the names of our KP endpoints (e.g., 'kg2c'). Since our KP endpoints are fixed at
+    startup, this lets Werkzeug's router do the endpoint matching; requests for unknown endpoints never reach our view
+    functions, and handle_not_found() gives them the usual "Endpoint specified in request ... does not exist" 404.
+    """
+    def __init__(self, url_map, *args, **kwargs):
+        super().__init__(url_map, *args, **kwargs)
+        self.regex = "(?:" + "|".join(re.escape(endpoint_name) for endpoint_name in plover_objs_map) + ")"
+
+
+app.url_map.converters["kp"] = KPEndpointConverter
+
+
+kp_routes = set()  # Routes (e.g., '/query') we serve under each KP endpoint
+
+
+def register_kp_routes(route: str, view_func, methods: List[str], include_default: bool = True):
+    kp_routes.add(route)
+    # Note: The two rules need distinct endpoint names, otherwise Werkzeug redirects '/<default KP>/...' to '/...'
+    if include_default:
+        app.add_url_rule(route, endpoint=view_func.__name__, view_func=view_func, methods=methods,
+                         defaults={"kp_endpoint_name": default_endpoint_name})
+    app.add_url_rule(f"/<kp:kp_endpoint_name>{route}", endpoint=f"kp_{view_func.__name__}", view_func=view_func,
+                     methods=methods)
+
+
+register_kp_routes("/query", run_query, ["POST"])
+register_kp_routes("/get_edges", get_edges, ["POST"])
+register_kp_routes("/get_neighbors", get_neighbors, ["POST"])
+register_kp_routes("/sri_test_triples", get_sri_test_triples, ["GET"])
+register_kp_routes("/meta_knowledge_graph", get_meta_knowledge_graph, ["GET"])
+register_kp_routes("", get_home_page, ["GET"], include_default=False)
+
+
+@app.errorhandler(404)
+def handle_not_found(e: werkzeug.exceptions.NotFound):
+    # Requests for unknown KP endpoints never reach our view functions, so we say what was wrong with them here
+    kp_endpoint_name, _, route = flask.request.path[1:].partition("/")
+    if flask.request.url_rule is None and kp_endpoint_name and (f"/{route}" if route else "") in kp_routes:
+        e.description = ENDPOINT_NOT_FOUND_MESSAGE % kp_endpoint_name
+    return e
+
+
+def accepts_gzip() -> bool:
+    # Respects q-values (e.g., 'gzip;q=0' means the client does *not* want gzip)
+    return flask.request.accept_encodings["gzip"] > 0
+
+
+@app.after_request
+def compress_response(response: flask.Response) -> flask.Response:
+    # Large TRAPI answers compress very well, which saves far more time on the network than it costs us in CPU
+    if (response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers
+            or response.status_code < 200 or response.status_code >= 300 or not accepts_gzip()):
+        return response
+    response_data = response.get_data()
+    if len(response_data) >= MIN_BYTES_TO_COMPRESS:
+        response.set_data(gzip.compress(response_data, compresslevel=GZIP_COMPRESSION_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def load_meta_kg_responses() -> Dict[str, Tuple[bytes, bytes]]:
+    meta_kg_responses = dict()
+    for endpoint_name, plover_obj in plover_objs_map.items():
+        meta_kg_json = app.json.dumps(plover_obj.meta_kg).encode()
+        meta_kg_responses[endpoint_name] = (meta_kg_json,
+                                            gzip.compress(meta_kg_json, compresslevel=GZIP_COMPRESSION_LEVEL))
+    return meta_kg_responses
+
+
+meta_kg_responses_map = load_meta_kg_responses()
+
+
+def healthcheck_middleware(wsgi_app):
+    """
+    Answers /healthcheck directly at the WSGI level, so that health probes skip Flask routing, tracing, and logging
+    entirely (keeps them cheap even when the service is under heavy load).
+    """
+    def wrapped_wsgi_app(environ, start_response):
+        if environ.get("PATH_INFO") == "/healthcheck":
+            start_response("200 OK", [("Content-Type", "text/html; charset=utf-8"), ("Content-Length", "0")])
+            return [b""]
+        return wsgi_app(environ, start_response)
+    return wrapped_wsgi_app
+
+
+# Note: This must wrap the app *after* instrumentation so that health probes don't create spans
+app.wsgi_app = healthcheck_middleware(app.wsgi_app)
 
 
 def handle_internal_error(e: Exception):
@@ -192,19 +400,11 @@ def run_get_logs():
         with open('/var/log/uwsgi.log', 'r') as f:
             log_data_uwsgi = f.readlines()
         response = {"description": f"The last {num_lines} lines from two logs (Plover and uwsgi) "
-                                   f"are included below. You can control the number of lines shown with the "
-                                   f"num_lines parameter (e.g., ?num_lines=500).",
+                                   f"are included below. Note that uwsgi does not log individual requests (the "
+                                   f"Plover log records each query). You can control the number of lines shown with "
+                                   f"the num_lines parameter (e.g., ?num_lines=500).",
                     "plover": log_data_plover[-num_lines:],
                     "uwsgi": log_data_uwsgi[-num_lines:]}
         return flask.jsonify(response)
     except Exception as e:
         handle_internal_error(e)
-
-
-@app.get("/<kp_endpoint_name>")
-def get_home_page(kp_endpoint_name: str):
-    if kp_endpoint_name in plover_objs_map:
-        logging.info(f"{kp_endpoint_name}: Going to homepage.")
-        return send_file(plover_objs_map[kp_endpoint_name].home_html_path, as_attachment=False)
-    else:
-        flask.abort(404, f"404 ERROR: Endpoint specified in request ('/{kp_endpoint_name}') does not exist")
@@ -1,28 +1,48 @@
 #!/usr/bin/env python3
-import copy
+import bisect
+import concurrent.futures
+from array import array
 import csv
 import gc
 import itertools
 import json
+import mmap
+import operator
 from datetime import datetime
 from urllib.parse import urlparse
 
 import flask
-import jsonlines
 import logging
+import multiprocessing
 import os
 import pickle
 import statistics
 import subprocess
+import sys
 import time
-from collections import defaultdict
-from typing import List, Dict, Union, Set, Optional, Tuple
+import tracemalloc
+import zlib
+from collections import defaultdict, OrderedDict
+from typing import List, Dict, Union, Set, Optional, Tuple, FrozenSet, Callable, Iterator, Hashable
 
+import orjson
 import psutil
+import pyarrow
+import pyarrow.compute
+import pyarrow.csv
+import pyarrow.json
 import requests
+import zstandard
 
 SCRIPT_DIR = f"{os.path.dirname(os.path.abspath(__file__))}"
 LOG_FILE_PATH = "/var/log/ploverdb.log"
+TRUE_STRINGS = frozenset({"t", "true"})
+FALSE_STRINGS = frozenset({"f", "false"})
+NONE_STRINGS = frozenset({"none", "null"})
+ZSTD_MAGIC_NUMBER = b"\x28\xb5\x2f\xfd"  # First four bytes of any zstd-compressed file
+NON_STRING_VALUE_FIRST_CHARS = frozenset("tTfFnN")  # First chars of (case-insensitive) strings in the sets above
+NUMERIC_TYPES = (int, float, complex)
+ORDERING_OPERATORS = {"<": operator.lt, ">": operator.gt, "<=": operator.le, ">=": operator.ge}
 
 
 class PloverDB:
@@ -41,8 +61,7 @@ class PloverDB:
                                           logging.FileHandler(f"{SCRIPT_DIR}/ploverdb.log")])
 
         self.config_file_name = config_file_name
-        with open(f"{SCRIPT_DIR}/../{self.config_file_name}") as config_file:
-            self.kg_config = json.load(config_file)
+        self.kg_config = self._load_json_file(f"{SCRIPT_DIR}/../{self.config_file_name}")
         self.endpoint_name = self.kg_config["endpoint_name"]
         self.sri_test_triples_path = f"{SCRIPT_DIR}/../sri_test_triples_{self.endpoint_name}.json"
         self.home_html_path = f"{SCRIPT_DIR}/../home_{self.endpoint_name}.html"
@@ -75,17 +94,21 @@ class PloverDB:
         self.predicate_map_reversed = dict()  # Maps predicate int ID --> english name
         self.node_lookup_map = dict()
         self.edge_lookup_map = dict()
-        self.main_index = dict()
-        self.subclass_index = dict()
+        self.main_index = dict()  # Holds a few flat int arrays (memory-mapped); see _freeze_main_index() for structure
+        self.node_ids = []  # Maps node int ID --> node ID (curie)
+        self.node_id_map = dict()  # Maps node ID (curie) --> node int ID
+        self.edge_ids = []  # Maps edge int ID --> edge ID
+        self.subclass_index = dict()  # Holds two flat int arrays (memory-mapped); see _freeze_subclass_index()
         self.conglomerate_predicate_descendant_index = defaultdict(set)
         self.meta_kg = dict()
-        self.preferred_id_map = dict()
+        self.preferred_id_map = dict()  # Only used while building; queries use the (memory-mapped) preferred ID index
+        self.preferred_id_index = dict()  # Holds a few flat arrays; see _build_preferred_id_index() for structure
         self.supported_qualifiers = {self.qedge_qualified_predicate_property, self.qedge_object_direction_property,
                                      self.qedge_object_aspect_property}
-        self.core_node_properties = {"name", self.categories_property}
-        self.core_edge_properties = {"subject", "object", "predicate", "primary_knowledge_source", "source_record_urls",
-                                     self.graph_qualified_predicate_property, self.graph_object_direction_property,
-                                     self.graph_object_aspect_property}
+        self.core_node_properties = frozenset({"name", self.categories_property})
+        self.core_edge_properties = frozenset({"subject", "object", "predicate", "primary_knowledge_source",
+                                               "source_record_urls", self.graph_qualified_predicate_property,
+                                               self.graph_object_direction_property, self.graph_object_aspect_property})
         self.trial_phases_map = {0: "not_provided", 0.5: "pre_clinical_research_phase",
                                  1: "clinical_trial_phase_1", 2: "clinical_trial_phase_2",
                                  3: "clinical_trial_phase_3", 4: "clinical_trial_phase_4",
@@ -98,13 +121,26 @@ class PloverDB:
                                             "aggregator_knowledge_source", "supporting_data_source"}
         self.kp_infores_curie = self.kg_config["kp_infores_curie"]
         self.edge_sources = self._load_edge_sources(self.kg_config)
+        self.primary_ks_source_shells = dict()  # Maps primary knowledge source --> TRAPI sources (if no sources template)
         self.query_log = []
+        # Recently computed category/predicate expansions, keyed by the (pre-expansion) categories/predicates
+        self.expanded_category_ids_cache = OrderedDict()
+        self.expanded_qedge_predicates_cache = OrderedDict()
+        self.expansion_cache_size = 1000
+        # Recently converted TRAPI nodes, keyed by node ID (popular nodes show up in answers over and over)
+        self.trapi_nodes_cache = OrderedDict()
+        self.trapi_nodes_cache_size = 20000
+        self.parse_chunk_size = 10 * 1024 * 1024  # Bytes per chunk when parsing KG files in parallel
+        self.num_sri_request_threads = 16  # Concurrent batch requests to the SRI NodeNormalizer
 
     # ------------------------------------------ INDEX BUILDING METHODS --------------------------------------------- #
 
     def build_indexes(self):
         logging.info(f"Starting to build indexes for endpoint {self.endpoint_name}..")
         start = time.time()
+        # Tracking allocations slows the build down quite a bit, so we only do so when debugging memory usage
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            tracemalloc.start()
         # Create a subdirectory to store pickles of indexes in
         os.makedirs(self.indexes_dir_path)
 
@@ -132,23 +168,33 @@ class PloverDB:
         if nodes_path.endswith(".tsv"):
             nodes = self._load_tsv(nodes_path)
         else:
-            with jsonlines.open(nodes_path) as reader:
-                nodes = [node_obj for node_obj in reader]
+            nodes = self._load_jsonl(nodes_path)
         logging.info(f"Have loaded nodes into memory.. now will load edges..")
 
         if edges_path.endswith(".tsv"):
             edges = self._load_tsv(edges_path)
         else:
-            with jsonlines.open(edges_path) as reader:
-                edges = [edge_obj for edge_obj in reader]
+            edges = self._load_jsonl(edges_path)
+
+        # If no equivalent identifiers were provided, start looking them up in the SRI NodeNormalizer in the background,
+        # so that waiting on the network overlaps with processing edges. Note: We only start this thread once edges are
+        # parsed, since parsing forks worker processes, and forking while another thread holds locks can deadlock.
+        sri_lookup = None
+        if self.kg_config.get("convert_input_ids") and \
+                not any(node.get("equivalent_curies") or node.get("equivalent_identifiers") or node.get("equivalent_ids")
+                        for node in nodes):
+            logging.info(f"Looking up equivalent identifiers in SRI NodeNormalizer (will cache for later use)")
+            sri_lookup_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            sri_lookup = sri_lookup_executor.submit(self._get_preferred_id_map_from_sri,
+                                                    list(dict.fromkeys(node["id"] for node in nodes)))
+            sri_lookup_executor.shutdown(wait=False)
 
         # Remove edge properties we don't care about (according to config file); rename others as needed
-        edge_properties_to_ignore = self.kg_config.get("ignore_edge_properties")
+        edge_properties_to_ignore = frozenset(self.kg_config.get("ignore_edge_properties") or [])
         if edge_properties_to_ignore:
             for edge in edges:
-                for prop_to_ignore in edge_properties_to_ignore:
-                    if prop_to_ignore in edge:
-                        del edge[prop_to_ignore]
+                for prop_to_ignore in edge_properties_to_ignore.intersection(edge):
+                    del edge[prop_to_ignore]
                 # Correct qualified property names (this is really for KG2..)
                 if "qualified_object_direction" in edge:
                     edge[self.graph_object_direction_property] = edge["qualified_object_direction"]
@@ -183,12 +229,12 @@ class PloverDB:
                                 item_obj[nested_prop_name] = self._convert_trial_phase_to_enum(item_obj[nested_prop_name])
                         del edge[nested_prop_name]  # Delete from top level now that we've moved it to nested level
 
-        # Delete any remaining top-level properties that are empty
-        for edge in edges:
-            empty_properties = {property_name for property_name, property_value in edge.items()
-                                if self._is_empty(property_value)}
-            for empty_property_name in empty_properties:
-                del edge[empty_property_name]
+        # Drop any remaining top-level properties that are empty; we rebuild each edge in one pass, which also leaves
+        # us with compact dicts (deleting keys one by one never shrinks a dict)
+        is_empty = self._is_empty
+        for edge_index, edge in enumerate(edges):
+            edges[edge_index] = {property_name: property_value for property_name, property_value in edge.items()
+                                 if not is_empty(property_value)}
 
         # Convert any trial phase property values from int to Biolink enum
         if self.trial_phase_properties:
@@ -214,7 +260,8 @@ class PloverDB:
         # Create basic node lookup map
         logging.info(f"Building basic node/edge lookup maps")
         logging.info(f"Loading node lookup map..")
-        self.node_lookup_map = {node["id"]: node for node in graph_dict["nodes"]}
+        # Note: We intern node IDs (which are repeated across our various maps/edges) so that each is stored only once
+        self.node_lookup_map = {sys.intern(node["id"]): node for node in graph_dict["nodes"]}
         node_properties_to_ignore = self.kg_config.get("ignore_node_properties", [])
         for node_key, node in self.node_lookup_map.items():
             # Remove node properties we don't care about (according to config file)
@@ -227,7 +274,7 @@ class PloverDB:
                                      + node.get("equivalent_ids", []))
                 if equivalent_ids:
                     for equiv_id in equivalent_ids:
-                        self.preferred_id_map[equiv_id] = node_key
+                        self.preferred_id_map[sys.intern(equiv_id)] = node_key
                     # Then delete no-longer-needed equiv IDs property (these can be huge, faster streaming without..)
                     if "equivalent_curies" in node:
                         del node["equivalent_curies"]
@@ -236,27 +283,35 @@ class PloverDB:
                     if "equivalent_ids" in node:
                         del node["equivalent_ids"]
             del node["id"]  # Don't need this anymore since it's now the key
+        del nodes, graph_dict  # The lookup map holds all node info from here on
         memory_usage_gb, memory_usage_percent = self._get_current_memory_usage()
         logging.info(f"Done loading node lookup map; there are {len(self.node_lookup_map)} nodes. "
                      f"Memory usage is currently {memory_usage_percent}% ({memory_usage_gb}G)..")
 
-        # Use the SRI NodeNormalizer to determine equivalent identifiers if none were provided in the nodes file
-        if self.kg_config.get("convert_input_ids") and not self.preferred_id_map:
-            logging.info(f"Looking up equivalent identifiers in SRI NodeNormalizer (will cache for later use)")
-            all_node_ids = list(self.node_lookup_map)
-            batch_size = 1000  # This is the suggested max batch size from Chris Bizon (in Translator slack..)
-            node_id_batches = [all_node_ids[batch_start:batch_start + batch_size]
-                               for batch_start in range(0, len(all_node_ids), batch_size)]
-            for node_id_batch in node_id_batches:
-                equiv_id_map_for_batch = self._get_equiv_id_map_from_sri(node_id_batch)
-                self.preferred_id_map.update(equiv_id_map_for_batch)
+        # Use the SRI NodeNormalizer's equivalent identifiers if none were provided in the nodes file
+        if sri_lookup:
+            logging.info(f"Waiting for SRI NodeNormalizer equivalent identifier lookups to finish..")
+            self.preferred_id_map.update(sri_lookup.result())
         logging.info(f"Preferred ID map includes {len(self.preferred_id_map)} equivalent identifiers.")
 
         # Create basic edge lookup map
         logging.info(f"Loading edge lookup map..")
         self.edge_lookup_map = {str(edge["id"]): edge for edge in edges}
+        # These properties only ever take on a handful of distinct values, but every edge gets its own parsed copy
+        categorical_edge_properties = ("primary_knowledge_source", "knowledge_level", "agent_type",
+                                       self.graph_qualified_predicate_property, self.graph_object_direction_property,
+                                       self.graph_object_aspect_property)
         for edge in self.edge_lookup_map.values():
             del edge["id"]  # Don't need this anymore since it's now the key
+            # Share one copy of each node ID/predicate string (also keeps them from being duplicated in our pickles)
+            edge["subject"] = sys.intern(edge["subject"])
+            edge["object"] = sys.intern(edge["object"])
+            edge[self.edge_predicate_property] = sys.intern(edge[self.edge_predicate_property])
+            for property_name in categorical_edge_properties:
+                property_value = edge.get(property_name)
+                if isinstance(property_value, str):
+                    edge[property_name] = sys.intern(property_value)
+        del edges  # Otherwise this list would keep edges alive even after we drop them (e.g., during normalization)
         gc.collect()  # Make sure we free up any memory we can
         memory_usage_gb, memory_usage_percent = self._get_current_memory_usage()
         logging.info(f"Done loading edge lookup map; there are {len(self.edge_lookup_map)} edges. "
@@ -269,35 +324,46 @@ class PloverDB:
             for edge in self.edge_lookup_map.values():
                 edge["subject"] = self.preferred_id_map[edge["subject"]]
                 edge["object"] = self.preferred_id_map[edge["object"]]
-                edge_key = (f'{edge["subject"]}--{edge["predicate"]}--{edge["object"]}--'
-                            f'{edge.get("primary_knowledge_source", "")}')
+                # Tuples of (interned) strings hash/compare cheaply; we only build string IDs for the merged edges
+                edge_key = (edge["subject"], edge["predicate"], edge["object"], edge.get("primary_knowledge_source", ""))
                 if edge_key in deduplicated_edges_map:
                     # Add this edge's array properties to the existing merged edge
                     merged_edge = deduplicated_edges_map[edge_key]
                     for property_name, value in edge.items():
                         if property_name in merged_edge:
                             if isinstance(value, list):
-                                merged_edge[property_name] = merged_edge[property_name] + value
+                                merged_edge[property_name].extend(value)  # In place; avoids quadratic copying
                         else:
                             merged_edge[property_name] = value
                 else:
                     deduplicated_edges_map[edge_key] = edge
             # Then eliminate any potential redundant study objs
             for deduplicated_edge in deduplicated_edges_map.values():
-                if deduplicated_edge.get("supporting_studies"):
-                    study_objs_by_nctids = {study_obj["nctid"]: study_obj
-                                            for study_obj in deduplicated_edge["supporting_studies"]}
-                    deduplicated_edge["supporting_studies"] = list(study_objs_by_nctids.values())
-            self.edge_lookup_map = deduplicated_edges_map
+                study_objs = deduplicated_edge.get("supporting_studies")
+                if study_objs:
+                    # Most edges have no repeats, so only rebuild the list if we actually find some
+                    nctids = {study_obj["nctid"] for study_obj in study_objs}
+                    if len(nctids) < len(study_objs):
+                        study_objs_by_nctids = {study_obj["nctid"]: study_obj for study_obj in study_objs}
+                        deduplicated_edge["supporting_studies"] = list(study_objs_by_nctids.values())
+            self.edge_lookup_map = {f"{subject}--{predicate}--{object_id}--{primary_knowledge_source}": edge
+                                    for (subject, predicate, object_id, primary_knowledge_source), edge
+                                    in deduplicated_edges_map.items()}
+            del deduplicated_edges_map
 
         # Convert all edges to their canonical predicate form; correct missing biolink prefixes
         logging.info(f"Converting edges to their canonical form")
+        # There are only so many distinct predicates, so we only ask BiolinkHelper about each one once
+        canonical_predicates_map = {None: None}
         for edge_id, edge in self.edge_lookup_map.items():
             predicate = edge[self.edge_predicate_property]
-            qualified_predicate = edge.get(self.graph_qualified_predicate_property)
-            canonical_predicate = self.bh.get_canonical_predicates(predicate, print_warnings=False)[0]
-            canonical_qualified_predicate = self.bh.get_canonical_predicates(qualified_predicate,
-                                                                             print_warnings=False)[0] if qualified_predicate else None
+            qualified_predicate = edge.get(self.graph_qualified_predicate_property) or None
+            for predicate_to_canonicalize in (predicate, qualified_predicate):
+                if predicate_to_canonicalize not in canonical_predicates_map:
+                    canonical_predicates_map[predicate_to_canonicalize] = self.bh.get_canonical_predicates(predicate_to_canonicalize,
+                                                                                                          print_warnings=False)[0]
+            canonical_predicate = canonical_predicates_map[predicate]
+            canonical_qualified_predicate = canonical_predicates_map[qualified_predicate]
             predicate_is_canonical = canonical_predicate == predicate
             qualified_predicate_is_canonical = canonical_qualified_predicate == qualified_predicate
             if qualified_predicate and \
@@ -325,40 +391,77 @@ class PloverDB:
 
         # Build a helper map of nodes --> category labels
         logging.info("Determining nodes' category labels (most specific Biolink categories)..")
+        # Note: Nodes share a small number of distinct category combos, so we only work out each combo's labels once
         node_to_category_labels_map = dict()
+        category_labels_by_categories = dict()
+        proper_ancestors_by_category = dict()
         for node_id, node in self.node_lookup_map.items():
-            categories = self._convert_to_set(node[self.categories_property])
-            proper_ancestors_for_each_category = [set(self.bh.get_ancestors(category, include_mixins=False, include_conflations=False)).difference({category})
-                                                  for category in categories]
-            all_proper_ancestors = set().union(*proper_ancestors_for_each_category)
-            most_specific_categories = categories.difference(all_proper_ancestors)
-            node_to_category_labels_map[node_id] = {self._get_category_id(category_name)
-                                                    for category_name in most_specific_categories}
-
-        # Build our main index (modified/nested adjacency list kind of structure)
+            categories = frozenset(self._convert_to_set(node[self.categories_property]))
+            category_labels = category_labels_by_categories.get(categories)
+            if category_labels is None:
+                for category in categories.difference(proper_ancestors_by_category):
+                    proper_ancestors_by_category[category] = set(self.bh.get_ancestors(category, include_mixins=False, include_conflations=False)).difference({category})
+                all_proper_ancestors = set().union(*(proper_ancestors_by_category[category] for category in categories))
+                most_specific_categories = categories.difference(all_proper_ancestors)
+                category_labels = frozenset(self._get_category_id(category_name)
+                                            for category_name in most_specific_categories)
+                category_labels_by_categories[categories] = category_labels
+            node_to_category_labels_map[node_id] = category_labels
+
+        # Assign nodes/edges int IDs (the main index refers to nodes/edges by these, which saves a lot of space)
+        # Note: Int IDs are just positions in the lookup maps, so load_indexes() can re-derive them from those maps
+        self._assign_int_ids()
+
+        # Build our main index (accumulate each node's adjacency rows, then freeze them into compact arrays)
+        # Note: Rows don't include the neighbor's categories yet; those get filled in when we freeze each node's rows
         logging.info("Building main index..")
+        self.main_index = defaultdict(lambda: array("i"))
         edges_count = 0
         qualified_edges_count = 0
         total = len(self.edge_lookup_map)
         max_allowed_percent_memory_usage = 90
-        for edge_id, edge in self.edge_lookup_map.items():
-            subject_id = edge["subject"]
-            object_id = edge["object"]
-            predicate = edge[self.edge_predicate_property]
-            predicate_id = self._get_predicate_id(predicate)
-            subject_category_ids = node_to_category_labels_map[subject_id]
-            object_category_ids = node_to_category_labels_map[object_id]
-            # Record this edge in the forwards and backwards directions
-            self._add_to_main_index(subject_id, object_id, object_category_ids, predicate_id, edge_id, 1)
-            self._add_to_main_index(object_id, subject_id, subject_category_ids, predicate_id, edge_id, 0)
-            # Record this edge under its qualified predicate/other properties, if such info is provided
-            if edge.get(self.graph_qualified_predicate_property) or edge.get(self.graph_object_direction_property) or edge.get(self.graph_object_aspect_property):
-                conglomerate_predicate_id = self._get_conglomerate_predicate_id_from_edge(edge)
-                self._add_to_main_index(subject_id, object_id, object_category_ids, conglomerate_predicate_id, edge_id, 1)
-                self._add_to_main_index(object_id, subject_id, subject_category_ids, conglomerate_predicate_id, edge_id, 0)
-                qualified_edges_count += 1
-            edges_count += 1
-            if edges_count % 1000000 == 0:
+        progress_batch_size = 1000000
+        # Note: This loop body runs once per edge, so we hoist everything it needs from self into locals up front
+        main_index = self.main_index
+        node_id_map = self.node_id_map
+        predicate_map = self.predicate_map
+        predicate_property = self.edge_predicate_property
+        qualified_predicate_property = self.graph_qualified_predicate_property
+        object_direction_property = self.graph_object_direction_property
+        object_aspect_property = self.graph_object_aspect_property
+        conglomerate_predicate_ids = dict()
+        # We work through edges in batches so that progress/memory checks happen once per batch, not once per edge
+        enumerated_edges = enumerate(self.edge_lookup_map.values())
+        while edges_count < total:
+            for edge_int_id, edge in itertools.islice(enumerated_edges, progress_batch_size):
+                subject_int_id = node_id_map[edge["subject"]]
+                object_int_id = node_id_map[edge["object"]]
+                predicate = edge[predicate_property]
+                predicate_id = predicate_map.get(predicate)
+                if predicate_id is None:
+                    predicate_id = self._get_predicate_id(predicate)
+                # Look up each node's rows just once per edge (rather than once per predicate we record the edge under)
+                subject_rows = main_index[subject_int_id]
+                object_rows = main_index[object_int_id]
+                # Record this edge in the forwards and backwards directions (1 means forwards, 0 means backwards)
+                subject_rows.extend((predicate_id, 1, object_int_id, edge_int_id))
+                object_rows.extend((predicate_id, 0, subject_int_id, edge_int_id))
+                # Record this edge under its qualified predicate/other properties, if such info is provided
+                qualified_predicate = edge.get(qualified_predicate_property)
+                object_direction = edge.get(object_direction_property)
+                object_aspect = edge.get(object_aspect_property)
+                if qualified_predicate or object_direction or object_aspect:
+                    # Only a handful of distinct qualifier combos exist, so we only build each conglomerate predicate once
+                    qualifier_combo = (predicate, qualified_predicate, object_direction, object_aspect)
+                    conglomerate_predicate_id = conglomerate_predicate_ids.get(qualifier_combo)
+                    if conglomerate_predicate_id is None:
+                        conglomerate_predicate_id = self._get_conglomerate_predicate_id_from_edge(edge)
+                        conglomerate_predicate_ids[qualifier_combo] = conglomerate_predicate_id
+                    subject_rows.extend((conglomerate_predicate_id, 1, object_int_id, edge_int_id))
+                    object_rows.extend((conglomerate_predicate_id, 0, subject_int_id, edge_int_id))
+                    qualified_edges_count += 1
+            edges_count = min(edges_count + progress_batch_size, total)
+            if edges_count % progress_batch_size == 0:
                 memory_usage_gb, memory_usage_percent = self._get_current_memory_usage()
                 logging.info(f"  Have processed {edges_count} edges ({round((edges_count / total) * 100)}%), "
                              f"{qualified_edges_count} of which were qualified edges. Memory usage is currently "
@@ -366,10 +469,19 @@ class PloverDB:
                 if memory_usage_percent > max_allowed_percent_memory_usage:
                     raise MemoryError(f"Main index size is greater than {max_allowed_percent_memory_usage}%;"
                                       f" terminating.")
+        self._log_top_memory_allocations()
         logging.info(f"Done building main index; there were {edges_count} edges, {qualified_edges_count} of which "
                      f"were qualified.")
-        self._save_to_pickle_file(self.main_index, f"{self.indexes_dir_path}/main_index.pkl")
-        del self.main_index
+        # (Nodes with the same category labels share a frozenset, so we only need one tuple per distinct frozenset)
+        category_label_tuples = {category_labels: tuple(category_labels)
+                                 for category_labels in set(node_to_category_labels_map.values())}
+        self._freeze_main_index([category_label_tuples[node_to_category_labels_map[node_id]] for node_id in self.node_ids])
+        self._save_arrays_file(self.main_index, f"{self.indexes_dir_path}/main_index.bin",
+                               {"num_node_ids": len(self.node_ids), "num_edge_ids": len(self.edge_ids)})
+        # Save the preferred ID index while we still have node int IDs (subclass edges still need the map itself though)
+        self._save_arrays_file(self._build_preferred_id_index(), f"{self.indexes_dir_path}/preferred_id_index.bin",
+                               {"num_node_ids": len(self.node_ids)})
+        del self.main_index, self.edge_ids
         gc.collect()
 
         # Record each conglomerate predicate in the KG under its ancestors
@@ -382,12 +494,13 @@ class PloverDB:
         subclass_edges = self._get_subclass_edges()
         self._build_subclass_index(subclass_edges)
         del subclass_edges
-        self._save_to_pickle_file(self.subclass_index, f"{self.indexes_dir_path}/subclass_index.pkl")
-        del self.subclass_index
+        self._freeze_subclass_index()
+        self._save_arrays_file(self.subclass_index, f"{self.indexes_dir_path}/subclass_index.bin",
+                               {"num_node_ids": len(self.node_ids)})
+        del self.subclass_index, self.node_ids, self.node_id_map  # Done with node int IDs now too
         gc.collect()
 
-        # Save the preferred ID map now that we're done using it
-        self._save_to_pickle_file(self.preferred_id_map, f"{self.indexes_dir_path}/preferred_id_map.pkl")
+        # We're done using the preferred ID map now (it's already been saved in index form)
         del self.preferred_id_map
         gc.collect()
 
@@ -405,56 +518,79 @@ class PloverDB:
         logging.info(f"Starting to build meta knowledge graph and SRI test triples..")
         # First identify unique meta edges
         meta_triples_map = defaultdict(set)
-        meta_qualifiers_map = defaultdict(lambda: defaultdict(set))
+        meta_qualifiers_map = defaultdict(set)  # Maps (meta triple, qualifier property) --> qualifier values
         test_triples_map = dict()
+        # Note: Edges with the same subject categories, predicate, and object categories map to the same meta triples,
+        # so we first condense edges into such groups (category labels are shared frozensets, so these keys are cheap)
+        meta_edge_groups = dict()
         for edge in self.edge_lookup_map.values():
-            subj_categories = node_to_category_labels_map[edge["subject"]]
-            obj_categories = node_to_category_labels_map[edge["object"]]
-            edge_attribute_names = set(edge.keys()).difference(self.core_edge_properties)
+            group_key = (node_to_category_labels_map[edge["subject"]], edge["predicate"],
+                         node_to_category_labels_map[edge["object"]])
+            meta_edge_group = meta_edge_groups.get(group_key)
+            if meta_edge_group is None:
+                # We also remember the group's first edge to use as an example edge (for test triples)
+                meta_edge_group = meta_edge_groups[group_key] = (set(), defaultdict(set), edge)
+            property_names, group_qualifiers_map, _ = meta_edge_group
+            property_names.update(edge.keys())
             qualified_predicate = edge.get(self.graph_qualified_predicate_property)
             object_dir_qualifier = edge.get(self.graph_object_direction_property)
             object_aspect_qualifier = edge.get(self.graph_object_aspect_property)
+            if qualified_predicate:
+                group_qualifiers_map[self.qedge_qualified_predicate_property].add(qualified_predicate)
+            if object_dir_qualifier:
+                group_qualifiers_map[self.qedge_object_direction_property].add(object_dir_qualifier)
+            if object_aspect_qualifier:
+                group_qualifiers_map[self.qedge_object_aspect_property].add(object_aspect_qualifier)
+        for (subj_categories, predicate, obj_categories), meta_edge_group in meta_edge_groups.items():
+            property_names, group_qualifiers_map, example_edge = meta_edge_group
+            edge_attribute_names = property_names.difference(self.core_edge_properties)
             for subj_category in subj_categories:
                 for obj_category in obj_categories:
-                    meta_triple = (subj_category, edge["predicate"], obj_category)
-                    meta_triples_map[meta_triple] = meta_triples_map[meta_triple].union(edge_attribute_names)
-                    if qualified_predicate:
-                        meta_qualifiers_map[meta_triple][self.qedge_qualified_predicate_property].add(qualified_predicate)
-                    if object_dir_qualifier:
-                        meta_qualifiers_map[meta_triple][self.qedge_object_direction_property].add(object_dir_qualifier)
-                    if object_aspect_qualifier:
-                        meta_qualifiers_map[meta_triple][self.qedge_object_aspect_property].add(object_aspect_qualifier)
+                    meta_triple = (subj_category, predicate, obj_category)
+                    meta_triples_map[meta_triple].update(edge_attribute_names)
+                    for qualifier_property, qualifier_values in group_qualifiers_map.items():
+                        meta_qualifiers_map[(meta_triple, qualifier_property)].update(qualifier_values)
                     # Create one test triple for each meta edge (basically an example edge)
                     if meta_triple not in test_triples_map:
                         test_triples_map[meta_triple] = {"subject_category": self.category_map_reversed[subj_category],
                                                          "object_category": self.category_map_reversed[obj_category],
-                                                         "predicate": edge["predicate"],
-                                                         "subject_id": edge["subject"],
-                                                         "object_id": edge["object"]}
-        meta_edges = [{"subject": self.category_map_reversed[triple[0]],
+                                                         "predicate": predicate,
+                                                         "subject_id": example_edge["subject"],
+                                                         "object_id": example_edge["object"]}
+        meta_triple_qualifiers_map = defaultdict(list)
+        for (meta_triple, qualifier_property), qualifier_values in meta_qualifiers_map.items():
+            meta_triple_qualifiers_map[meta_triple].append({"qualifier_type_id": qualifier_property,
+                                                            "applicable_values": list(qualifier_values)})
+        del meta_qualifiers_map
+        # Note: We use a generator here; meta edges are streamed to disk one at a time rather than all held in memory
+        # There are only so many distinct attribute names, so we only create each one's meta attribute once
+        meta_attributes_map = {attribute_name: {"attribute_type_id": self._get_trapi_edge_attribute(attribute_name, None, dict())["attribute_type_id"],
+                                                "constraint_use": True,
+                                                "constraint_name": attribute_name.replace("_", " ")}  # TODO: Do this for real..
+                               for attribute_name in set().union(*meta_triples_map.values())}
+        meta_edges = ({"subject": self.category_map_reversed[triple[0]],
                        "predicate": triple[1],
                        "object": self.category_map_reversed[triple[2]],
-                       "attributes": [{"attribute_type_id": self._get_trapi_edge_attribute(attribute_name, None, dict())["attribute_type_id"],
-                                       "constraint_use": True,
-                                       "constraint_name": attribute_name.replace("_", " ")}  # TODO: Do this for real..
-                                      for attribute_name in attribute_names],
-                       "qualifiers": [{"qualifier_type_id": qualifier_property,
-                                       "applicable_values": list(qualifier_values)}
-                                      for qualifier_property, qualifier_values in meta_qualifiers_map[triple].items()]}
-                      for triple, attribute_names in meta_triples_map.items()]
-        logging.info(f"Identified {len(meta_edges)} different meta edges")
+                       "attributes": [meta_attributes_map[attribute_name] for attribute_name in attribute_names],
+                       "qualifiers": meta_triple_qualifiers_map.get(triple, [])}
+                      for triple, attribute_names in meta_triples_map.items())
+        logging.info(f"Identified {len(meta_triples_map)} different meta edges")
         # Then construct meta nodes
-        category_to_prefixes_map = defaultdict(set)
+        # Note: Nodes share category label frozensets, so we collect prefixes per distinct set of labels and only then
+        # spread them across categories (rather than doing a set add for every category of every node)
+        category_labels_to_prefixes_map = defaultdict(set)
         for node_key, categories in node_to_category_labels_map.items():
-            prefix = node_key.split(":")[0]
+            category_labels_to_prefixes_map[categories].add(node_key.partition(":")[0])
+        category_to_prefixes_map = defaultdict(set)
+        for categories, prefixes in category_labels_to_prefixes_map.items():
             for category in categories:
-                category_to_prefixes_map[category].add(prefix)
+                category_to_prefixes_map[category].update(prefixes)
+        del category_labels_to_prefixes_map
         meta_nodes = {self.category_map_reversed[category]: {"id_prefixes": list(prefixes)}
                       for category, prefixes in category_to_prefixes_map.items()}
         logging.info(f"Identified {len(meta_nodes)} different meta nodes")
-        self.meta_kg = {"nodes": meta_nodes, "edges": meta_edges}
-        self._save_to_pickle_file(self.meta_kg, f"{self.indexes_dir_path}/meta_kg.pkl")
-        del self.meta_kg, meta_nodes, meta_edges, node_to_category_labels_map
+        self._save_meta_kg_file(meta_nodes, meta_edges, f"{self.indexes_dir_path}/meta_kg.json")
+        del meta_nodes, meta_edges, node_to_category_labels_map
         gc.collect()
 
         # Save some other indexes we're done using/modifying
@@ -467,8 +603,8 @@ class PloverDB:
         test_triples_dict = {"edges": list(test_triples_map.values())}
         logging.info(f"Saving test triples file to {self.sri_test_triples_path}; includes "
                      f"{len(test_triples_dict['edges'])} test triples")
-        with open(self.sri_test_triples_path, "w+") as test_triples_file:
-            json.dump(test_triples_dict, test_triples_file)
+        with open(self.sri_test_triples_path, "wb") as test_triples_file:
+            test_triples_file.write(orjson.dumps(test_triples_dict))
         del test_triples_dict
 
         # Add a build node for this Plover build (don't want this in the meta KG, so we add it here)
@@ -501,9 +637,11 @@ class PloverDB:
 
         if not self.is_test:
             logging.info(f"Removing local unzipped nodes/edges files from the image now that index building is done")
-            subprocess.call(["rm", "-f", nodes_path])
-            subprocess.call(["rm", "-f", edges_path])
+            self._remove_file(nodes_path)
+            self._remove_file(edges_path)
 
+        self._log_top_memory_allocations()
+        tracemalloc.stop()
         logging.info(f"Done building indexes! Took {round((time.time() - start) / 60, 2)} minutes.")
 
     def load_indexes(self):
@@ -517,30 +655,74 @@ class PloverDB:
         logging.info(f"Loading indexes from {self.indexes_dir_path} (in parallel)..")
         start = time.time()
 
-        self.node_lookup_map = self._load_pickle_file(f"{self.indexes_dir_path}/node_lookup_map.pkl")
-        self.edge_lookup_map = self._load_pickle_file(f"{self.indexes_dir_path}/edge_lookup_map.pkl")
-        self.main_index = self._load_pickle_file(f"{self.indexes_dir_path}/main_index.pkl")
-        self.subclass_index = self._load_pickle_file(f"{self.indexes_dir_path}/subclass_index.pkl")
-        self.predicate_map = self._load_pickle_file(f"{self.indexes_dir_path}/predicate_map.pkl")
-        self.predicate_map_reversed = self._load_pickle_file(f"{self.indexes_dir_path}/predicate_map_reversed.pkl")
-        self.category_map = self._load_pickle_file(f"{self.indexes_dir_path}/category_map.pkl")
-        self.category_map_reversed = self._load_pickle_file(f"{self.indexes_dir_path}/category_map_reversed.pkl")
-        self.conglomerate_predicate_descendant_index = self._load_pickle_file(f"{self.indexes_dir_path}/conglomerate_predicate_descendant_index.pkl")
-        self.meta_kg = self._load_pickle_file(f"{self.indexes_dir_path}/meta_kg.pkl")
-        self.preferred_id_map = self._load_pickle_file(f"{self.indexes_dir_path}/preferred_id_map.pkl")
-
-        # Set up BiolinkHelper
+        # Note: Unpickling itself holds the GIL, but file reads/decompression don't, so threads overlap those parts
+        pickled_index_names = ["node_lookup_map", "edge_lookup_map", "predicate_map",
+                               "predicate_map_reversed", "category_map", "category_map_reversed",
+                               "conglomerate_predicate_descendant_index"]
         from biolink_helper import BiolinkHelper
-        self.bh = BiolinkHelper(biolink_version=self.biolink_version)
+        # Unpickling creates millions of container objects, none of which are garbage; don't let that set off the GC
+        gc.disable()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(pickled_index_names) + 1) as executor:
+                # Set up BiolinkHelper alongside our index loads (loading the Biolink model is mostly waiting on I/O)
+                bh_future = executor.submit(BiolinkHelper, biolink_version=self.biolink_version)
+                index_futures = {index_name: executor.submit(self._load_pickle_file,
+                                                             f"{self.indexes_dir_path}/{index_name}.pkl")
+                                 for index_name in pickled_index_names}
+                self.meta_kg = self._load_json_file(f"{self.indexes_dir_path}/meta_kg.json")
+                # Note: We gather results in a fixed order (rather than as they complete) so assignment is deterministic
+                for index_name, index_future in index_futures.items():
+                    setattr(self, index_name, index_future.result())
+                self.bh = bh_future.result()
+        finally:
+            gc.enable()
+        self._assign_int_ids()
+        self._share_node_id_strings()
+        # Note: These arrays refer to nodes/edges by int ID, so loading checks they match the lookup maps we just loaded
+        node_id_counts = {"num_node_ids": len(self.node_ids)}
+        self.main_index = self._load_arrays_file(f"{self.indexes_dir_path}/main_index.bin",
+                                                 {**node_id_counts, "num_edge_ids": len(self.edge_ids)})
+        self.preferred_id_index = self._load_arrays_file(f"{self.indexes_dir_path}/preferred_id_index.bin",
+                                                         node_id_counts)
+        self.subclass_index = self._load_arrays_file(f"{self.indexes_dir_path}/subclass_index.bin", node_id_counts)
+
+        # Our indexes live for the life of the process, so exempt them from future garbage collection passes (which
+        # would otherwise traverse them over and over, and dirty pages that forked workers could otherwise share)
+        gc.collect()
+        gc.freeze()
 
         logging.info(f"Indexes are fully loaded! Took {round((time.time() - start) / 60, 2)} minutes.")
 
+    def _assign_int_ids(self):
+        # Node/edge int IDs are their positions in the lookup maps (excluding the build node, which is added at the
+        # very end of the build); deriving them from the maps means the curie strings aren't duplicated in memory
+        self.node_ids = [node_id for node_id in self.node_lookup_map if node_id != "PloverDB"]
+        self.node_id_map = dict(zip(self.node_ids, range(len(self.node_ids))))
+        self.edge_ids = list(self.edge_lookup_map)
+
+    def _share_node_id_strings(self):
+        # Node/edge lookup maps are pickled separately, so after loading, each edge's subject/object curies are copies
+        # of the node lookup map's keys; point them back at those keys (like at build time, when they're interned) so
+        # each curie is stored just once in memory, and comparisons between them are identity checks
+        node_ids = {node_id: node_id for node_id in self.node_lookup_map}
+        for edge in self.edge_lookup_map.values():
+            edge["subject"] = node_ids.get(edge["subject"], edge["subject"])
+            edge["object"] = node_ids.get(edge["object"], edge["object"])
+
     @staticmethod
     def _load_pickle_file(file_path: str) -> any:
         start = time.time()
         logging.info(f"Loading {file_path} into memory..")
-        with open(file_path, "rb") as pickle_file:
-            contents = pickle.load(pickle_file)
+        # We memory-map the file so pickle/zstd read straight out of the page cache (no intermediate read buffers)
+        with open(file_path, "rb") as pickle_file, \
+                mmap.mmap(pickle_file.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+            if hasattr(file_map, "madvise"):
+                file_map.madvise(mmap.MADV_SEQUENTIAL)  # We read it front to back exactly once
+            # Note: Indexes built before we always compressed are plain pickles, so we still support reading those
+            if file_map[:len(ZSTD_MAGIC_NUMBER)] == ZSTD_MAGIC_NUMBER:
+                contents = pickle.load(zstandard.ZstdDecompressor().stream_reader(file_map))
+            else:
+                contents = pickle.loads(file_map)
         logging.info(f"Done loading {file_path} into memory. Took {round(time.time() - start, 1)} seconds.")
         return contents
 
@@ -548,23 +730,162 @@ class PloverDB:
     def _save_to_pickle_file(item: any, file_path: str):
         logging.info(f"Saving data to {file_path}..")
         with open(file_path, "wb") as pickle_file:
-            pickle.dump(item, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+            # Compress as we go, using all cores (our pickles shrink several-fold, so there's a lot less to write)
+            compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+            with compressor.stream_writer(pickle_file, closefd=False) as compressed_file:
+                pickle.dump(item, compressed_file, protocol=pickle.HIGHEST_PROTOCOL)
         logging.info(f"Done saving data to {file_path}.")
 
-    def _add_to_main_index(self, node_a_id: str, node_b_id: str, node_b_category_ids: Set[int], predicate_id: int,
-                           edge_id: int, direction: int):
-        # Note: A direction of 1 means forwards, 0 means backwards
-        main_index = self.main_index
-        if node_a_id not in main_index:
-            main_index[node_a_id] = dict()
-        for category_id in node_b_category_ids:
-            if category_id not in main_index[node_a_id]:
-                main_index[node_a_id][category_id] = dict()
-            if predicate_id not in main_index[node_a_id][category_id]:
-                main_index[node_a_id][category_id][predicate_id] = (dict(), dict())
-            if node_b_id not in main_index[node_a_id][category_id][predicate_id][direction]:
-                main_index[node_a_id][category_id][predicate_id][direction][node_b_id] = set()
-            main_index[node_a_id][category_id][predicate_id][direction][node_b_id].add(edge_id)
+    @staticmethod
+    def _load_json_file(file_path: str) -> any:
+        logging.info(f"Loading {file_path} into memory..")
+        with open(file_path, "rb") as json_file:
+            contents = orjson.loads(json_file.read())
+        logging.info(f"Done loading {file_path} into memory.")
+        return contents
+
+    @staticmethod
+    def _save_meta_kg_file(meta_nodes: Dict[str, dict], meta_edges: Iterator[dict], file_path: str):
+        # We write the meta KG's JSON piece by piece so that the full list of meta edges never has to exist in memory
+        logging.info(f"Saving meta KG to {file_path}..")
+        with open(file_path, "wb") as meta_kg_file:
+            meta_kg_file.write(b'{"nodes": ')
+            meta_kg_file.write(orjson.dumps(meta_nodes))
+            meta_kg_file.write(b', "edges": [')
+            for edge_num, meta_edge in enumerate(meta_edges):
+                if edge_num:
+                    meta_kg_file.write(b", ")
+                meta_kg_file.write(orjson.dumps(meta_edge))
+            meta_kg_file.write(b"]}")
+        logging.info(f"Done saving meta KG to {file_path}.")
+
+    @staticmethod
+    def _load_arrays_file(file_path: str, int_id_counts: Dict[str, int]) -> Dict[str, memoryview]:
+        # We memory-map the file rather than reading it in: pages are only read in as queries touch them, and they live
+        # in the OS page cache, which all of our worker processes share
+        logging.info(f"Memory-mapping {file_path}..")
+        with open(file_path, "rb") as arrays_file:
+            file_map = mmap.mmap(arrays_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(file_map, "madvise"):
+            file_map.madvise(mmap.MADV_RANDOM)  # Queries jump around the index; don't bother reading ahead
+        header_size = int.from_bytes(file_map[:8], "little")
+        header = json.loads(file_map[8:8 + header_size])
+        # Int IDs are just positions in the lookup maps, so arrays from a different build would silently give wrong
+        # answers; make sure the arrays were built for the same number of node/edge int IDs we have
+        if header.get("int_id_counts") != int_id_counts:
+            raise ValueError(f"{file_path} was built for int ID counts {header.get('int_id_counts')}, but our lookup "
+                             f"maps give {int_id_counts}. Indexes appear to be from different builds; rebuild them.")
+        file_view = memoryview(file_map)
+        arrays = {array_name: file_view[offset:offset + length * array(typecode).itemsize].cast(typecode)
+                  for array_name, (typecode, length, offset) in header["arrays"].items()}
+        logging.info(f"Done memory-mapping {file_path}.")
+        return arrays
+
+    @staticmethod
+    def _save_arrays_file(arrays: Dict[str, array], file_path: str, int_id_counts: Dict[str, int]):
+        # File is a small JSON header (the node/edge int ID counts the arrays were built for, plus array names,
+        # typecodes, lengths, and offsets) followed by each array's raw buffer; buffers start on 8-byte boundaries so
+        # they can be used in place once memory-mapped
+        logging.info(f"Saving arrays to {file_path}..")
+        alignment = 8
+        arrays_info = {array_name: [int_array.typecode, len(int_array), 0]
+                       for array_name, int_array in arrays.items()}
+        header_template = {"int_id_counts": int_id_counts, "arrays": arrays_info}
+        header_size = len(json.dumps(header_template)) + 32 * len(arrays)  # Leave room for the offsets' digits
+        offset = alignment + header_size + (-header_size % alignment)
+        for array_name, int_array in arrays.items():
+            arrays_info[array_name][2] = offset
+            offset += len(int_array) * int_array.itemsize
+            offset += -offset % alignment
+        header = json.dumps(header_template).encode().ljust(header_size)
+        with open(file_path, "wb") as arrays_file:
+            arrays_file.write(header_size.to_bytes(8, "little"))
+            arrays_file.write(header)
+            for array_name, int_array in arrays.items():
+                arrays_file.seek(arrays_info[array_name][2])
+                int_array.tofile(arrays_file)
+        logging.info(f"Done saving arrays to {file_path}.")
+
+    def _freeze_main_index(self, node_category_ids: List[Tuple[int, ...]]):
+        """
+        Converts the flat (predicate, direction, neighbor, edge) adjacency rows accumulated for each node during the
+        build into the main index's final form, recording each row under each of its neighbor's categories (given by
+        node int ID in node_category_ids). The final form is a handful of flat arrays (no per-node Python objects, so
+        it's compact and quick to save/load):
+            - node_group_offsets: groups for node int ID n are those in [node_group_offsets[n], node_group_offsets[n + 1])
+            - group_category_ids/group_predicate_ids/group_directions: the category/predicate/direction of each group
+            - group_row_offsets: rows for group g are those in [group_row_offsets[g], group_row_offsets[g + 1])
+            - neighbor_int_ids/edge_int_ids: the neighbor node and edge (int IDs) in each row
+        Within a group, rows are sorted by neighbor (so specific neighbors can be binary searched for) and are
+        deduplicated.
+        """
+        logging.info("Freezing main index into compact arrays..")
+        accumulated_rows = self.main_index
+        node_group_offsets = array("q", [0])
+        group_category_ids = array("i")
+        group_predicate_ids = array("i")
+        group_directions = array("b")
+        group_row_offsets = array("q", [0])
+        neighbor_int_ids = array("i")
+        edge_int_ids = array("i")
+        for node_int_id in range(len(self.node_ids)):
+            node_rows = accumulated_rows.pop(node_int_id, None)  # Pop as we go so memory is freed incrementally
+            if node_rows:
+                # Sort by group (category, predicate, direction), then neighbor, then edge
+                row_tuples = sorted({(category_id, predicate_id, direction, neighbor_int_id, edge_int_id)
+                                     for predicate_id, direction, neighbor_int_id, edge_int_id in zip(*[iter(node_rows)] * 4)
+                                     for category_id in node_category_ids[neighbor_int_id]})
+                for (category_id, predicate_id, direction), group_rows in itertools.groupby(row_tuples,
+                                                                                            key=lambda row: row[:3]):
+                    for row in group_rows:
+                        neighbor_int_ids.append(row[3])
+                        edge_int_ids.append(row[4])
+                    group_category_ids.append(category_id)
+                    group_predicate_ids.append(predicate_id)
+                    group_directions.append(direction)
+                    group_row_offsets.append(len(edge_int_ids))
+            node_group_offsets.append(len(group_category_ids))
+        self.main_index = {"node_group_offsets": node_group_offsets,
+                           "group_category_ids": group_category_ids,
+                           "group_predicate_ids": group_predicate_ids,
+                           "group_directions": group_directions,
+                           "group_row_offsets": group_row_offsets,
+                           "neighbor_int_ids": neighbor_int_ids,
+                           "edge_int_ids": edge_int_ids}
+
+    def _build_preferred_id_index(self) -> Dict[str, array]:
+        """
+        Converts the preferred ID map (equivalent ID --> preferred node ID) into a few flat arrays, so that it can be
+        memory-mapped at query time rather than unpickled into a huge dict in every process:
+            - equiv_id_bytes: all equivalent IDs (UTF-8), sorted and concatenated
+            - equiv_id_offsets: equivalent ID i is equiv_id_bytes[equiv_id_offsets[i]:equiv_id_offsets[i + 1]]
+            - preferred_node_int_ids: the int ID of the preferred node for each equivalent ID
+            - bucket_offsets/bucket_equiv_id_positions: a hash table over the equivalent IDs; the equivalent IDs that
+              hash (CRC-32, which unlike Python's hash() is stable across processes) to bucket b are those at positions
+              bucket_equiv_id_positions[bucket_offsets[b]:bucket_offsets[b + 1]]
+        """
+        logging.info(f"Building preferred ID index from {len(self.preferred_id_map)} equivalent identifiers..")
+        equiv_ids = sorted(self.preferred_id_map)
+        encoded_equiv_ids = [equiv_id.encode() for equiv_id in equiv_ids]
+        equiv_id_offsets = array("q", [0])
+        equiv_id_offsets.extend(itertools.accumulate(map(len, encoded_equiv_ids)))
+        equiv_id_bytes = array("B", b"".join(encoded_equiv_ids))
+        preferred_node_int_ids = array("i", (self.node_id_map[self.preferred_id_map[equiv_id]]
+                                             for equiv_id in equiv_ids))
+        num_buckets = max(len(equiv_ids), 1)  # One bucket per equivalent ID keeps buckets to a couple entries at most
+        equiv_id_buckets = [zlib.crc32(encoded_equiv_id) % num_buckets for encoded_equiv_id in encoded_equiv_ids]
+        del encoded_equiv_ids
+        bucket_sizes = [0] * num_buckets
+        for bucket in equiv_id_buckets:
+            bucket_sizes[bucket] += 1
+        bucket_offsets = array("q", [0])
+        bucket_offsets.extend(itertools.accumulate(bucket_sizes))
+        bucket_equiv_id_positions = array("i", sorted(range(len(equiv_ids)), key=equiv_id_buckets.__getitem__))
+        return {"equiv_id_bytes": equiv_id_bytes,
+                "equiv_id_offsets": equiv_id_offsets,
+                "preferred_node_int_ids": preferred_node_int_ids,
+                "bucket_offsets": bucket_offsets,
+                "bucket_equiv_id_positions": bucket_equiv_id_positions}
 
     def _get_conglomerate_predicate_from_edge(self, edge: dict) -> str:
         qualified_predicate = edge.get(self.graph_qualified_predicate_property)
@@ -607,22 +928,45 @@ class PloverDB:
         # Record each conglomerate predicate in the KG under its ancestors (inc. None and regular predicate variations)
         logging.info("Building conglomerate qualified predicate descendant index..")
         conglomerate_predicates_already_seen = set()
-        for edge_id, edge in self.edge_lookup_map.items():
-            conglomerate_predicate = self._get_conglomerate_predicate_from_edge(edge)
-            qualified_predicate = edge.get(self.graph_qualified_predicate_property)
-            qualified_obj_direction = edge.get(self.graph_object_direction_property)
-            qualified_obj_aspect = edge.get(self.graph_object_aspect_property)
-            if (qualified_predicate or qualified_obj_direction or qualified_obj_aspect) and conglomerate_predicate not in conglomerate_predicates_already_seen:
-                predicate_variations = [qualified_predicate, edge.get(self.edge_predicate_property)]
-                for predicate in predicate_variations:
-                    predicate_ancestors = set(self.bh.get_ancestors(predicate)).union({None})
-                    direction_ancestors = set(self.bh.get_ancestors(qualified_obj_direction)).union({None})
-                    aspect_ancestors = set(self.bh.get_ancestors(qualified_obj_aspect)).union({None})
-                    ancestor_combinations = set(itertools.product(predicate_ancestors, direction_ancestors, aspect_ancestors))
-                    ancestor_conglomerate_predicates = {f"{combination[0]}--{combination[1]}--{combination[2]}"
-                                                        for combination in ancestor_combinations}.difference({"None--None--None"})
-                    for ancestor in ancestor_conglomerate_predicates:
-                        self.conglomerate_predicate_descendant_index[ancestor].add(conglomerate_predicate)
+        # Note: Only so many distinct qualifier combos/values exist, so we skip repeats and look up ancestors just once
+        qualifier_combos_already_seen = set()
+        ancestors_map = dict()  # Maps predicate/direction/aspect --> its Biolink ancestors (plus None)
+        # Resolve attributes up front, rather than on every edge
+        predicate_property = self.edge_predicate_property
+        qualified_predicate_property = self.graph_qualified_predicate_property
+        object_direction_property = self.graph_object_direction_property
+        object_aspect_property = self.graph_object_aspect_property
+        get_ancestors = self.bh.get_ancestors
+        get_conglomerate_predicate = self._get_conglomerate_predicate
+        conglomerate_predicate_descendant_index = self.conglomerate_predicate_descendant_index
+        for edge in self.edge_lookup_map.values():
+            qualified_predicate = edge.get(qualified_predicate_property)
+            qualified_obj_direction = edge.get(object_direction_property)
+            qualified_obj_aspect = edge.get(object_aspect_property)
+            if not (qualified_predicate or qualified_obj_direction or qualified_obj_aspect):
+                continue
+            predicate = edge.get(predicate_property)
+            qualifier_combo = (predicate, qualified_predicate, qualified_obj_direction, qualified_obj_aspect)
+            if qualifier_combo in qualifier_combos_already_seen:
+                continue
+            qualifier_combos_already_seen.add(qualifier_combo)
+            conglomerate_predicate = get_conglomerate_predicate(qualified_predicate=qualified_predicate,
+                                                                predicate=predicate,
+                                                                object_direction=qualified_obj_direction,
+                                                                object_aspect=qualified_obj_aspect)
+            if conglomerate_predicate not in conglomerate_predicates_already_seen:
+                for item in qualifier_combo:
+                    if item not in ancestors_map:
+                        ancestors_map[item] = set(get_ancestors(item)).union({None})
+                # Combine ancestors of both predicate variations so each ancestor combo is only stringified once
+                predicate_ancestors = ancestors_map[qualified_predicate] | ancestors_map[predicate]
+                ancestor_combinations = itertools.product(predicate_ancestors,
+                                                          ancestors_map[qualified_obj_direction],
+                                                          ancestors_map[qualified_obj_aspect])
+                for ancestor_predicate, ancestor_direction, ancestor_aspect in ancestor_combinations:
+                    if (ancestor_predicate, ancestor_direction, ancestor_aspect) != (None, None, None):
+                        ancestor = f"{ancestor_predicate}--{ancestor_direction}--{ancestor_aspect}"
+                        conglomerate_predicate_descendant_index[ancestor].add(conglomerate_predicate)
                 conglomerate_predicates_already_seen.add(conglomerate_predicate)
 
     def _get_subclass_edges(self) -> List[dict]:
@@ -640,17 +984,14 @@ class PloverDB:
                 subclass_edges_path = f"{SCRIPT_DIR}/../{subclass_edges_file_name_unzipped}"
                 self._download_and_unzip_remote_file(subclass_edges_remote_file_url, subclass_edges_path)
                 logging.info(f"Loading subclass edges and filtering out those not involving our nodes..")
-                with jsonlines.open(subclass_edges_path) as reader:
-                    # TODO: Make smarter... need to be connected, not necessarily directly? and add to preferred id map?
-                    subclass_edges = [edge_obj for edge_obj in reader
-                                      if edge_obj["subject"] in self.preferred_id_map
-                                      and edge_obj["object"] in self.preferred_id_map]
+                # TODO: Make smarter... need to be connected, not necessarily directly? and add to preferred id map?
+                subclass_edges = self._load_subclass_edges(subclass_edges_path)
                 logging.info(f"Identified {len(subclass_edges)} subclass edges linking to equivalent IDs of our nodes")
                 logging.info(f"Remapping those edges to use our preferred identifiers..")
                 for edge in subclass_edges:
                     edge["subject"] = self.preferred_id_map[edge["subject"]]
                     edge["object"] = self.preferred_id_map[edge["object"]]
-                subprocess.call(["rm", "-f", subclass_edges_path])
+                self._remove_file(subclass_edges_path)
             else:
                 logging.warning(f"No url to a subclass edges file provided in {self.config_file_name}. Will proceed "
                                 f"without subclass concept reasoning.")
@@ -664,67 +1005,80 @@ class PloverDB:
 
         # Deduplicate subclass edges (now primary source doesn't matter since we've already filtered on that)
         logging.info(f"Deduplicating subclass edges based on triples..")
-        deduplicated_subclass_edges_map = {f"{edge['subject']}--{edge['predicate']}--{edge['object']}": edge
+        deduplicated_subclass_edges_map = {(edge["subject"], edge["predicate"], edge["object"]): edge
                                            for edge in subclass_edges}
         subclass_edges = list(deduplicated_subclass_edges_map.values())
         logging.info(f"In the end, have {len(subclass_edges)} subclass triples to base concept subclass reasoning on")
 
         return subclass_edges
 
+    def _load_subclass_edges(self, subclass_edges_path: str) -> List[dict]:
+        # Only keeps edges whose subject and object are both (equivalents of) our nodes. Arrow parses the file one block
+        # at a time and checks membership in C; only each block's surviving edges are kept (as Python dicts).
+        edge_properties = dict.fromkeys(["subject", "object", "predicate", self.edge_predicate_property,
+                                         "primary_knowledge_source"])
+        edges_reader = pyarrow.json.open_json(subclass_edges_path,
+                                              read_options=pyarrow.json.ReadOptions(block_size=self.parse_chunk_size),
+                                              parse_options=pyarrow.json.ParseOptions(
+                                                  explicit_schema=pyarrow.schema([(property_name, pyarrow.string())
+                                                                                  for property_name in edge_properties]),
+                                                  unexpected_field_behavior="ignore"))
+        our_equiv_ids = pyarrow.array(list(self.preferred_id_map), type=pyarrow.string())
+        subclass_edges = []
+        for edges_batch in edges_reader:
+            edges_mask = pyarrow.compute.and_(pyarrow.compute.is_in(edges_batch["subject"], value_set=our_equiv_ids),
+                                              pyarrow.compute.is_in(edges_batch["object"], value_set=our_equiv_ids))
+            subclass_edges += edges_batch.filter(edges_mask).to_pylist()
+        return subclass_edges
+
     def _build_subclass_index(self, subclass_edges: List[dict]):
         logging.info(f"Building subclass_of index using {len(subclass_edges)} subclass_of edges..")
         start = time.time()
 
-        def _get_descendants(node_id: str, parent_to_child_map: Dict[str, Set[str]],
-                             parent_to_descendants_map: Dict[str, Set[str]], recursion_depth: int,
-                             problem_nodes: Set[str]):
-            if node_id not in parent_to_descendants_map:
-                if recursion_depth > 20:
-                    problem_nodes.add(node_id)
-                else:
-                    for child_id in parent_to_child_map.get(node_id, []):
-                        child_descendants = _get_descendants(child_id, parent_to_child_map, parent_to_descendants_map,
-                                                             recursion_depth + 1, problem_nodes)
-                        parent_to_descendants_map[node_id] = parent_to_descendants_map[node_id].union({child_id}, child_descendants)
-            return parent_to_descendants_map.get(node_id, set())
-
         # Build a map of nodes to their direct 'subclass_of' children
+        # Note: We work with node int IDs here, which are much cheaper to hash/store than curies in the closure below
         parent_to_child_dict = defaultdict(set)
+        predicate_property = self.edge_predicate_property
+        node_ids = self.node_ids
+        node_id_map = self.node_id_map
         for edge in subclass_edges:
-            parent_node_id = edge["object"] if edge[self.edge_predicate_property] == "biolink:subclass_of" else edge["subject"]
-            child_node_id = edge["subject"] if edge[self.edge_predicate_property] == "biolink:subclass_of" else edge["object"]
-            parent_to_child_dict[parent_node_id].add(child_node_id)
+            subject_int_id = node_id_map[edge["subject"]]
+            object_int_id = node_id_map[edge["object"]]
+            # Check the edge's orientation just once (anything that's not subclass_of here is superclass_of)
+            if edge[predicate_property] == "biolink:subclass_of":
+                parent_to_child_dict[object_int_id].add(subject_int_id)
+            else:
+                parent_to_child_dict[subject_int_id].add(object_int_id)
         logging.info(f"A total of {len(parent_to_child_dict)} nodes have child subclasses")
 
-        # Then recursively derive all 'subclass_of' descendants for each node
+        # Then derive all 'subclass_of' descendants for each node
         if parent_to_child_dict:
-            root = "root"  # Need something to act as a parent to all other parents, as a starting point
-            parent_to_child_dict[root] = set(parent_to_child_dict)
-            parent_to_descendants_dict = defaultdict(set)
-            problem_nodes = set()
-            _ = _get_descendants(root, parent_to_child_dict, parent_to_descendants_dict, 0, problem_nodes)
+            # Note: Nodes with too many descendants come back with None for their descendants
+            parent_to_descendants_dict, problem_nodes = self._get_all_descendants(parent_to_child_dict,
+                                                                                  max_descendants=5000)
 
             # Filter out some unhelpful nodes (too many descendants and/or not useful)
-            del parent_to_descendants_dict["root"]
-            node_ids = set(parent_to_descendants_dict)
-            for node_id in node_ids:
-                if len(parent_to_descendants_dict[node_id]) > 5000 or node_id.startswith("biolink:"):
-                    del parent_to_descendants_dict[node_id]
-            deleted_node_ids = node_ids.difference(set(parent_to_descendants_dict))
+            parent_int_ids = set(parent_to_descendants_dict)
+            for node_int_id in parent_int_ids:
+                if parent_to_descendants_dict[node_int_id] is None or node_ids[node_int_id].startswith("biolink:"):
+                    del parent_to_descendants_dict[node_int_id]
+            deleted_node_ids = [node_ids[node_int_id]
+                                for node_int_id in parent_int_ids.difference(set(parent_to_descendants_dict))]
 
             self.subclass_index = parent_to_descendants_dict
 
             # Print out/save some useful stats
-            logging.info(f"Hit recursion depth for {len(problem_nodes)} nodes. Truncated their lineages.")
-            parent_to_num_descendants = {node_id: len(descendants) for node_id, descendants in parent_to_descendants_dict.items()}
+            logging.info(f"Found {len(problem_nodes)} nodes involved in subclass_of cycles.")
+            parent_to_num_descendants = {node_ids[node_int_id]: len(descendants)
+                                         for node_int_id, descendants in parent_to_descendants_dict.items()}
             descendant_counts = list(parent_to_num_descendants.values())
             prefix_counts = defaultdict(int)
             top_50_biggest_parents = sorted(parent_to_num_descendants.items(), key=lambda x: x[1], reverse=True)[:50]
-            for node_id in parent_to_descendants_dict:
+            for node_id in parent_to_num_descendants:
                 prefix = node_id.split(":")[0]
                 prefix_counts[prefix] += 1
             sorted_prefix_counts = dict(sorted(prefix_counts.items(), key=lambda count: count[1], reverse=True))
-            with open("subclass_report.json", "w+") as report_file:
+            with open("subclass_report.json", "wb") as report_file:
                 report = {"total_edges_in_kg": len(self.edge_lookup_map),
                           "num_subclass_of_edges_from_approved_sources": len(subclass_edges),
                           "num_nodes_with_descendants": {
@@ -739,7 +1093,7 @@ class PloverDB:
                           },
                           "problem_nodes": {
                               "count": len(problem_nodes),
-                              "curies": list(problem_nodes)
+                              "curies": [node_ids[node_int_id] for node_int_id in problem_nodes]
                           },
                           "top_50_biggest_parents": {
                               "counts": {item[0]: item[1] for item in top_50_biggest_parents},
@@ -747,46 +1101,187 @@ class PloverDB:
                           },
                           "deleted_nodes": {
                               "count": len(deleted_node_ids),
-                              "curies": list(deleted_node_ids)
+                              "curies": deleted_node_ids
                           },
                           "example_mappings": {
-                              "Diabetes mellitus (MONDO:0005015)": list(self.subclass_index.get("MONDO:0005015", [])),
-                              "Adams-Oliver syndrome (MONDO:0007034)": list(self.subclass_index.get("MONDO:0007034", []))
+                              "Diabetes mellitus (MONDO:0005015)": self._get_subclass_report_example("MONDO:0005015"),
+                              "Adams-Oliver syndrome (MONDO:0007034)": self._get_subclass_report_example("MONDO:0007034")
                           }
                           }
-                json.dump(report, report_file, indent=2)
+                report_file.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
 
         logging.info(f"Building subclass_of index took {round((time.time() - start) / 60, 2)} minutes.")
 
+    def _get_subclass_report_example(self, node_id: str) -> List[str]:
+        descendant_int_ids = self.subclass_index.get(self.node_id_map.get(node_id), [])
+        return [self.node_ids[descendant_int_id] for descendant_int_id in descendant_int_ids]
+
+    def _freeze_subclass_index(self):
+        """
+        Converts the subclass index (node int ID --> descendant node int IDs) into two flat arrays, keyed by node int ID, so
+        that it can be memory-mapped like the main index rather than unpickled as a big dict of sets:
+            - descendant_offsets: descendants of node int ID n are those in [descendant_offsets[n], descendant_offsets[n + 1])
+            - descendant_int_ids: the (sorted) node int IDs of each node's descendants
+        """
+        logging.info("Freezing subclass index into compact arrays..")
+        descendant_offsets = array("q", [0])
+        descendant_int_ids = array("i")
+        for node_int_id in range(len(self.node_ids)):
+            descendants = self.subclass_index.get(node_int_id)
+            if descendants:
+                descendant_int_ids.extend(sorted(descendants))
+            descendant_offsets.append(len(descendant_int_ids))
+        self.subclass_index = {"descendant_offsets": descendant_offsets,
+                               "descendant_int_ids": descendant_int_ids}
+
+    @staticmethod
+    def _get_all_descendants(parent_to_child_map: Dict[int, Set[int]],
+                             max_descendants: Optional[int] = None) -> Tuple[Dict[int, Optional[FrozenSet[int]]], Set[int]]:
+        """
+        Computes the transitive closure of the given parent --> children map in a single iterative pass. Uses Tarjan's
+        algorithm to find strongly connected components (i.e., cycles), which it emits in reverse topological order, so
+        each component's descendants can be derived directly from its (already finished) children. Returns a map of
+        each parent node to its descendants and the set of nodes involved in cycles. Nodes with identical descendants
+        share a single frozenset (which also keeps them from being duplicated in pickles). Nodes with more than
+        max_descendants descendants (if specified) map to None instead; their ancestors necessarily have even more
+        descendants, so we skip building those (largest) sets altogether.
+        """
+        descendants_map = dict()
+        shared_descendant_sets = dict()
+        problem_nodes = set()
+        node_indexes = dict()
+        low_links = dict()
+        stack = []
+        on_stack = set()
+        for start_node_id in parent_to_child_map:
+            if start_node_id in node_indexes:
+                continue
+            node_indexes[start_node_id] = low_links[start_node_id] = len(node_indexes)
+            stack.append(start_node_id)
+            on_stack.add(start_node_id)
+            work_stack = [(start_node_id, iter(parent_to_child_map[start_node_id]))]
+            while work_stack:
+                node_id, child_ids_iter = work_stack[-1]
+                for child_id in child_ids_iter:
+                    if child_id not in node_indexes:
+                        # Descend into this child first (we'll resume this node's remaining children afterwards)
+                        node_indexes[child_id] = low_links[child_id] = len(node_indexes)
+                        stack.append(child_id)
+                        on_stack.add(child_id)
+                        work_stack.append((child_id, iter(parent_to_child_map.get(child_id, ()))))
+                        break
+                    elif child_id in on_stack:
+                        low_links[node_id] = min(low_links[node_id], node_indexes[child_id])
+                else:
+                    # We're done with all of this node's children
+                    work_stack.pop()
+                    if work_stack:
+                        parent_id = work_stack[-1][0]
+                        low_links[parent_id] = min(low_links[parent_id], low_links[node_id])
+                    if low_links[node_id] == node_indexes[node_id]:
+                        # This node is the root of a component; all components below it are already done
+                        component = set()
+                        while True:
+                            member_id = stack.pop()
+                            on_stack.discard(member_id)
+                            component.add(member_id)
+                            if member_id == node_id:
+                                break
+                        component_descendants = set()
+                        for member_id in component:
+                            for child_id in parent_to_child_map.get(member_id, ()):
+                                if child_id not in component:
+                                    child_descendants = descendants_map.get(child_id, ())
+                                    if child_descendants is None:
+                                        component_descendants = None
+                                        break
+                                    component_descendants.add(child_id)
+                                    component_descendants.update(child_descendants)
+                            if component_descendants is None:
+                                break
+                        if len(component) > 1:
+                            problem_nodes.update(component)
+                        if component_descendants is None or \
+                                (max_descendants is not None and
+                                 len(component_descendants) + len(component) - 1 > max_descendants):
+                            for member_id in component:
+                                descendants_map[member_id] = None
+                        elif len(component) > 1:
+                            # Members of a cycle are all descendants of each other
+                            for member_id in component:
+                                member_descendants = frozenset(component_descendants.union(component.difference({member_id})))
+                                descendants_map[member_id] = shared_descendant_sets.setdefault(member_descendants,
+                                                                                               member_descendants)
+                        else:
+                            node_descendants = frozenset(component_descendants)
+                            descendants_map[node_id] = shared_descendant_sets.setdefault(node_descendants,
+                                                                                         node_descendants)
+
+        # Only parents belong in the final map
+        parent_to_descendants_map = {node_id: descendants for node_id, descendants in descendants_map.items()
+                                     if descendants is None or descendants}
+        return parent_to_descendants_map, problem_nodes
+
+    @staticmethod
+    def _remove_file(file_path: str):
+        # Equivalent of 'rm -f', but without forking a process
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            pass
+
     @staticmethod
     def _download_and_unzip_remote_file(remote_file_path: str, local_destination_path: str):
         remote_file_name = remote_file_path.split("/")[-1]
-        temp_location = f"{SCRIPT_DIR}/{remote_file_name}"
         logging.info(f"Downloading remote file from URL: {remote_file_path}")
-        subprocess.check_call(["curl", "-L", remote_file_path, "-o", temp_location])
+        curl_command = ["curl", "-L", "--fail", "--retry", "3", remote_file_path]
         if remote_file_name.endswith(".gz"):
-            logging.info(f"Unzipping downloaded file")
-            subprocess.check_call(["gunzip", "-f", temp_location])
-            temp_location = temp_location.strip(".gz")
-        subprocess.check_call(["mv", temp_location, local_destination_path])
+            # Unzip as we download, rather than writing the zipped file to disk and then reading it back in
+            logging.info(f"Unzipping downloaded file as it streams in")
+            with open(local_destination_path, "wb") as local_file:
+                curl_process = subprocess.Popen(curl_command, stdout=subprocess.PIPE)
+                gunzip_process = subprocess.Popen(["gunzip", "-c"], stdin=curl_process.stdout, stdout=local_file)
+                curl_process.stdout.close()  # So curl gets a SIGPIPE if gunzip exits early
+                gunzip_return_code = gunzip_process.wait()
+                curl_return_code = curl_process.wait()
+            if curl_return_code:
+                raise subprocess.CalledProcessError(curl_return_code, curl_command)
+            if gunzip_return_code:
+                raise subprocess.CalledProcessError(gunzip_return_code, ["gunzip", "-c"])
+        else:
+            subprocess.check_call(curl_command + ["-o", local_destination_path])
 
     def _print_main_index_human_friendly(self):
-        counter = 0
-        for input_curie, categories_dict in self.main_index.items():
-            if counter <= 10:
-                print(f"{input_curie}: #####################################################################")
-                for category_id, predicates_dict in categories_dict.items():
-                    print(f"    {self.category_map_reversed[category_id]}: ------------------------------")
-                    for predicate_id, directions_tuple in predicates_dict.items():
-                        print(f"        {self.predicate_map_reversed[predicate_id]}:")
-                        for direction_dict in directions_tuple:
-                            print(f"        {'Forwards' if directions_tuple.index(direction_dict) == 1 else 'Backwards'}:")
-                            for output_curie, edge_ids in direction_dict.items():
-                                print(f"            {output_curie}:")
-                                print(f"                {edge_ids}")
-            else:
-                break
-            counter += 1
+        # This is a debugging aid only; skip the (slow) walk over the index unless we're actually debugging
+        if not logging.getLogger().isEnabledFor(logging.DEBUG):
+            return
+        main_index = self.main_index
+        node_group_offsets = main_index["node_group_offsets"]
+        group_row_offsets = main_index["group_row_offsets"]
+        neighbor_int_ids = main_index["neighbor_int_ids"]
+        edge_int_ids = main_index["edge_int_ids"]
+        # Just print the first 11 nodes that actually have edges
+        nodes_with_edges = ((node_int_id, node_id) for node_int_id, node_id in enumerate(self.node_ids)
+                            if node_group_offsets[node_int_id] != node_group_offsets[node_int_id + 1])
+        for node_int_id, node_id in itertools.islice(nodes_with_edges, 11):
+            print(f"{node_id}: #####################################################################")
+            for group in range(node_group_offsets[node_int_id], node_group_offsets[node_int_id + 1]):
+                start, end = group_row_offsets[group], group_row_offsets[group + 1]
+                print(f"    {self.category_map_reversed[main_index['group_category_ids'][group]]}: ------------------------------")
+                print(f"        {self.predicate_map_reversed[main_index['group_predicate_ids'][group]]}:")
+                print(f"        {'Forwards' if main_index['group_directions'][group] == 1 else 'Backwards'}:")
+                for neighbor_int_id, edge_int_id in zip(neighbor_int_ids[start:end], edge_int_ids[start:end]):
+                    print(f"            {self.node_ids[neighbor_int_id]}:")
+                    print(f"                {self.edge_ids[edge_int_id]}")
+
+    @staticmethod
+    def _log_top_memory_allocations(num_lines: int = 10):
+        # Only does anything if tracemalloc was started (i.e., when debugging); reports memory currently allocated
+        # by line of code, which tracemalloc tracks as allocations happen (no walk over our huge indexes needed)
+        if tracemalloc.is_tracing():
+            top_stats = tracemalloc.take_snapshot().statistics("lineno")[:num_lines]
+            logging.debug(f"Top {len(top_stats)} lines by memory allocated:\n" +
+                          "\n".join(str(stat) for stat in top_stats))
 
     @staticmethod
     def _get_current_memory_usage():
@@ -796,44 +1291,96 @@ class PloverDB:
         memory_used_in_gb = virtual_mem_usage_info[3] / 10**9
         return round(memory_used_in_gb, 1), memory_percent_used
 
-    def _load_tsv(self, tsv_file_path: str) -> List[dict]:
+    def _load_jsonl(self, jsonl_file_path: str) -> List[dict]:
+        # Parse the file in newline-aligned chunks, spread across worker processes (parsing is CPU-bound)
+        chunk_ranges = self._get_file_chunk_ranges(jsonl_file_path, self.parse_chunk_size)
+        logging.info(f"Parsing {jsonl_file_path} in {len(chunk_ranges)} chunks..")
+        chunk_args = [(jsonl_file_path, chunk_start, chunk_end) for chunk_start, chunk_end in chunk_ranges]
         items = []
+        if len(chunk_args) > 1:
+            with multiprocessing.Pool(min(os.cpu_count() or 1, len(chunk_args))) as pool:
+                for chunk_items in pool.imap(self._load_jsonl_chunk, chunk_args):
+                    items += chunk_items
+        else:
+            for chunk_arg in chunk_args:
+                items += self._load_jsonl_chunk(chunk_arg)
+        logging.info(f"Loaded {len(items)} rows from {jsonl_file_path}")
+        return items
+
+    @staticmethod
+    def _get_file_chunk_ranges(file_path: str, chunk_size: int) -> List[Tuple[int, int]]:
+        # Returns (start, end) byte offsets of roughly chunk_size-sized pieces of the file, each ending on a newline
+        file_size = os.path.getsize(file_path)
+        chunk_ranges = []
+        with open(file_path, "rb") as file:
+            chunk_start = 0
+            while chunk_start < file_size:
+                file.seek(min(chunk_start + chunk_size, file_size))
+                file.readline()  # Advance to the end of the current line
+                chunk_end = file.tell()
+                chunk_ranges.append((chunk_start, chunk_end))
+                chunk_start = chunk_end
+        return chunk_ranges
+
+    @staticmethod
+    def _load_jsonl_chunk(chunk_arg: Tuple[str, int, int]) -> List[dict]:
+        file_path, chunk_start, chunk_end = chunk_arg
+        with open(file_path, "rb") as file:
+            file.seek(chunk_start)
+            chunk = file.read(chunk_end - chunk_start)
+        # Frame lines with a single bytes.split(); any '\r' left on a line is just trailing JSON whitespace. isspace()
+        # catches blank lines without allocating a stripped copy of every line like strip() does.
+        return [orjson.loads(line) for line in chunk.split(b"\n") if line and not line.isspace()]
+
+    def _load_tsv(self, tsv_file_path: str) -> List[dict]:
+        # Arrow tokenizes the TSV in C, in blocks; we only touch Python objects to convert values column by column
         with open(tsv_file_path, "r") as tsv_file:
-            reader = csv.reader(tsv_file, delimiter="\t")
-            header_row = next(reader)  # Grabs first row of TSV
-            logging.info(f"Header row in {tsv_file_path} is: {header_row}")
-            for row in reader:
-                item = {header_row[index]: self._load_column_value(value, header_row[index])
-                        for index, value in enumerate(row)}
-                if item:  # Skip blank lines
-                    items.append(item)
+            header_row = next(csv.reader(tsv_file, delimiter="\t"))  # Grabs first row of TSV
+        logging.info(f"Header row in {tsv_file_path} is: {header_row}")
+        # Read everything as strings; _load_value() decides on actual types
+        reader = pyarrow.csv.open_csv(tsv_file_path,
+                                      read_options=pyarrow.csv.ReadOptions(block_size=1 << 20),
+                                      parse_options=pyarrow.csv.ParseOptions(delimiter="\t"),
+                                      convert_options=pyarrow.csv.ConvertOptions(
+                                          column_types={col_name: pyarrow.string() for col_name in header_row},
+                                          strings_can_be_null=False))
+        # Figure out which columns hold lists once per file, rather than per record batch
+        column_is_array = [col_name in self.array_properties for col_name in header_row]
+        load_value = self._load_value
+        items = []
+        for record_batch in reader:
+            columns = []
+            for is_array, column in zip(column_is_array, record_batch.columns):
+                if is_array:
+                    # Load lists as actual lists, instead of strings
+                    split_column = pyarrow.compute.split_pattern(column, ",").to_pylist()
+                    columns.append([[load_value(val) for val in col_values] for col_values in split_column])
+                else:
+                    columns.append([load_value(col_value) for col_value in column.to_pylist()])
+            items += [dict(zip(header_row, row)) for row in zip(*columns)]
         logging.info(f"Loaded {len(items)} rows from {tsv_file_path}")
         return items
 
-    def _load_column_value(self, col_value: any, col_name: str) -> any:
-        # Load lists as actual lists, instead of strings
-        if col_name in self.array_properties:
-            return [self._load_value(val) for val in col_value.split(",")]
-        else:
-            return self._load_value(col_value)
-
     @staticmethod
     def _load_value(val: str) -> any:
-        if isinstance(val, str):
+        if not isinstance(val, str):
+            return val
+        # Most values (e.g., curies) are plain strings; the first char tells us that without building any temporaries
+        first_char = val[:1]
+        if first_char.isdigit() or first_char == ".":
             if val.isdigit():
                 return int(val)
             elif val.replace(".", "").isdigit():
                 return float(val)
-            elif val.lower() in {"t", "true"}:
+        elif first_char in NON_STRING_VALUE_FIRST_CHARS:
+            val_lowercase = val.lower()
+            if val_lowercase in TRUE_STRINGS:
                 return True
-            elif val.lower() in {"f", "false"}:
+            elif val_lowercase in FALSE_STRINGS:
                 return False
-            elif val.lower() in {"none", "null"}:
+            elif val_lowercase in NONE_STRINGS:
                 return None
-            else:
-                return val
-        else:
-            return val
+        return val
 
     def _convert_trial_phase_to_enum(self, phase_value: any) -> any:
         if phase_value in self.trial_phases_map:
@@ -843,28 +1390,56 @@ class PloverDB:
         else:
             return phase_value
 
-    def _is_empty(self, value: any) -> bool:
-        if isinstance(value, list):
-            return True if all(self._is_empty(item) for item in value) else False
-        elif value or isinstance(value, (int, float, complex)):
-            return False
-        else:
-            return True
-
-    def _get_equiv_id_map_from_sri(self, node_ids: List[str]) -> Dict[str, str]:
-        response = requests.post("https://nodenormalization-sri.renci.org/get_normalized_nodes",
+    @staticmethod
+    def _is_empty(value: any) -> bool:
+        # A value is empty if it's falsy and non-numeric, or is a list containing only empty values (at any depth);
+        # we walk nested lists with a stack and stop at the first non-empty value we find
+        values_to_check = [value]
+        while values_to_check:
+            value = values_to_check.pop()
+            if isinstance(value, list):
+                values_to_check.extend(value)
+            elif value or isinstance(value, NUMERIC_TYPES):
+                return False
+        return True
+
+    def _get_preferred_id_map_from_sri(self, node_ids: List[str]) -> Dict[str, str]:
+        batch_size = 1000  # This is the suggested max batch size from Chris Bizon (in Translator slack..)
+        node_id_batches = [node_ids[batch_start:batch_start + batch_size]
+                           for batch_start in range(0, len(node_ids), batch_size)]
+        preferred_id_map = dict()
+        # Send batches concurrently (we're just waiting on the network); map() keeps results in batch order
+        with requests.Session() as session, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.num_sri_request_threads) as executor:
+            # Retry batches the NodeNormalizer turns away (e.g., when it's throttling us) rather than losing them
+            retries = requests.adapters.Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                                              allowed_methods=None, raise_on_status=False)
+            session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1,
+                                                                    pool_maxsize=self.num_sri_request_threads,
+                                                                    max_retries=retries))
+            for equiv_id_map_for_batch in executor.map(lambda node_id_batch:
+                                                       self._get_equiv_id_map_from_sri(node_id_batch, session),
+                                                       node_id_batches):
+                preferred_id_map.update(equiv_id_map_for_batch)
+        logging.info(f"Done looking up equivalent identifiers for {len(node_ids)} nodes in SRI NodeNormalizer")
+        return preferred_id_map
+
+    def _get_equiv_id_map_from_sri(self, node_ids: List[str], session: requests.Session) -> Dict[str, str]:
+        response = session.post("https://nodenormalization-sri.renci.org/get_normalized_nodes",
                                  json={"curies": node_ids,
                                        "conflate": True,
                                        "drug_chemical_conflate": self.kg_config.get("drug_chemical_conflation", False)})
 
-        equiv_id_map = {node_id: node_id for node_id in node_ids}  # Preferred IDs for nodes are themselves
+        # Preferred IDs for nodes are themselves (interned, like the node lookup map's keys, so these share one string)
+        equiv_id_map = {node_id: node_id for node_id in map(sys.intern, node_ids)}
         if response.status_code == 200:
-            for node_id, normalized_info in response.json().items():
+            for node_id, normalized_info in orjson.loads(response.content).items():
                 if normalized_info:  # This means the SRI NN recognized the node ID we asked for
                     equiv_nodes = normalized_info["equivalent_identifiers"]
+                    preferred_id = sys.intern(node_id)
                     for equiv_node in equiv_nodes:
-                        equiv_id = equiv_node["identifier"]
-                        equiv_id_map[equiv_id] = node_id
+                        equiv_id = sys.intern(equiv_node["identifier"])
+                        equiv_id_map[equiv_id] = preferred_id
         else:
             logging.warning(f"Request for batch of node IDs sent to SRI NodeNormalizer failed "
                             f"(status: {response.status_code}). Input identifier synonymization may not work properly.")
@@ -890,13 +1465,13 @@ class PloverDB:
         self.query_log = []  # Clear query log of any prior entries
         # Handle case where someone submits only a query graph (not nested in a 'message')
         trapi_query = {"message": {"query_graph": trapi_query}} if "nodes" in trapi_query else trapi_query
-        trapi_qg = copy.deepcopy(trapi_query["message"]["query_graph"])
+        trapi_qg = self._copy_query_graph(trapi_query["message"]["query_graph"])
         # Before doing anything else, convert any node ids to equivalents we recognize
         for qnode_key, qnode in trapi_qg["nodes"].items():
             qnode_ids = qnode.get("ids")
             if qnode_ids:
                 self.log_trapi("INFO", f"Converting qnode {qnode_key}'s 'ids' to equivalent ids we recognize")
-                qnode["ids"] = list({self.preferred_id_map.get(input_id, input_id) for input_id in qnode_ids})
+                qnode["ids"] = list({self._get_preferred_id(input_id) for input_id in qnode_ids})
 
         # Handle single-node queries (not part of TRAPI, but handy)
         if not trapi_qg.get("edges"):
@@ -927,32 +1502,12 @@ class PloverDB:
 
         # Expand qnode ids to descendant concepts and record original query IDs
         descendant_to_query_id_map = {subject_qnode_key: defaultdict(set), object_qnode_key: defaultdict(set)}
-        if subject_qnode.get("ids"):
-            subject_qnode_curies_with_descendants = list()
-            subject_qnode_curies = set(subject_qnode["ids"])
-            for query_curie in subject_qnode_curies:
-                descendants = self._get_descendants(query_curie)
-                for descendant in descendants:
-                    # We only want to record the mapping in the case of a true descendant
-                    if descendant not in subject_qnode_curies:
-                        descendant_to_query_id_map[subject_qnode_key][descendant].add(query_curie)
-                subject_qnode_curies_with_descendants += descendants
-            subject_qnode["ids"] = list(set(subject_qnode_curies_with_descendants))
-            log_message = f"After expansion to descendant concepts, subject qnode has {len(subject_qnode['ids'])} ids"
-            self.log_trapi("INFO", log_message)
-        if object_qnode.get("ids"):
-            object_qnode_curies_with_descendants = list()
-            object_qnode_curies = set(object_qnode["ids"])
-            for query_curie in object_qnode_curies:
-                descendants = self._get_descendants(query_curie)
-                for descendant in descendants:
-                    # We only want to record the mapping in the case of a true descendant
-                    if descendant not in object_qnode_curies:
-                        descendant_to_query_id_map[object_qnode_key][descendant].add(query_curie)
-                object_qnode_curies_with_descendants += descendants
-            object_qnode["ids"] = list(set(object_qnode_curies_with_descendants))
-            log_message = f"After expansion to descendant concepts, object qnode has {len(object_qnode['ids'])} ids"
-            self.log_trapi("INFO", log_message)
+        for qnode_role, qnode_key in (("subject", subject_qnode_key), ("object", object_qnode_key)):
+            qnode = trapi_qg["nodes"][qnode_key]
+            if qnode.get("ids"):
+                self._expand_qnode_ids_to_descendants(qnode, descendant_to_query_id_map[qnode_key])
+                log_message = f"After expansion to descendant concepts, {qnode_role} qnode has {len(qnode['ids'])} ids"
+                self.log_trapi("INFO", log_message)
 
         # Actually answer the query
         input_qnode_key = self._determine_input_qnode_key(trapi_qg["nodes"])
@@ -965,11 +1520,32 @@ class PloverDB:
         # Temporarily keeping the 'include_metadata' option to make Plover backwards-compatible for pathfinder
         if trapi_qg.get("include_metadata") is True:
             # TODO: Delete after Pathfinder is updated for Plover2.0
-            nodes = {input_qnode_key: {node_id: self.get_node_as_tuple(node_id) + (list(descendant_to_query_id_map[input_qnode_key].get(node_id, set())),)
-                                       for node_id in input_qnode_answers},
-                     output_qnode_key: {node_id: self.get_node_as_tuple(node_id) + (list(descendant_to_query_id_map[output_qnode_key].get(node_id, set())),)
-                                        for node_id in output_qnode_answers}}
-            edges = {qedge_key: {edge_id: self.get_edge_as_tuple(edge_id) for edge_id in qedge_answers}}
+            # Build the tuples inline (with attribute lookups hoisted), since there can be many thousands of answers
+            node_lookup_map = self.node_lookup_map
+            categories_property = self.categories_property
+            nodes = {input_qnode_key: dict(), output_qnode_key: dict()}
+            for qnode_key, qnode_answers in ((input_qnode_key, input_qnode_answers),
+                                             (output_qnode_key, output_qnode_answers)):
+                qnode_nodes = nodes[qnode_key]
+                query_ids_map = descendant_to_query_id_map[qnode_key]
+                for node_id in qnode_answers:
+                    node = node_lookup_map[node_id]
+                    qnode_nodes[node_id] = (node.get("name"), node[categories_property][0],
+                                            list(query_ids_map.get(node_id, ())))
+            edge_lookup_map = self.edge_lookup_map
+            predicate_property = self.edge_predicate_property
+            qualified_predicate_property = self.graph_qualified_predicate_property
+            object_direction_property = self.graph_object_direction_property
+            object_aspect_property = self.graph_object_aspect_property
+            qedge_edges = dict()
+            for edge_id in qedge_answers:
+                edge = edge_lookup_map[edge_id]
+                # Silly to have the last one as a string, but that's the old format... will delete eventually
+                qedge_edges[edge_id] = (edge["subject"], edge["object"], edge[predicate_property],
+                                        edge.get("primary_knowledge_source"), edge.get(qualified_predicate_property, ""),
+                                        edge.get(object_direction_property, ""), edge.get(object_aspect_property, ""),
+                                        "False")
+            edges = {qedge_key: qedge_edges}
             log_message = f"Done with query, returning {qedge_answers} edges (slim format)"
             return {"nodes": nodes, "edges": edges}
         elif trapi_qg.get("include_metadata") is False:
@@ -993,41 +1569,45 @@ class PloverDB:
             self.log_trapi("INFO", log_message)
             return trapi_response
 
-    def get_node_as_tuple(self, node_id: str) -> tuple:
-        # TODO: Delete after Pathfinder is updated for Plover2.0
-        node = self.node_lookup_map[node_id]
-        categories = node[self.categories_property]
-        category = categories[0] if isinstance(categories, list) else categories
-        return node.get("name"), node.get(self.categories_property)[0]
-
-    def get_edge_as_tuple(self, edge_id: str) -> tuple:
-        # TODO: Delete after Pathfinder is updated for Plover2.0
-        edge = self.edge_lookup_map[edge_id]
-        return (edge["subject"], edge["object"], edge[self.edge_predicate_property],
-                edge.get("primary_knowledge_source"), edge.get(self.graph_qualified_predicate_property, ""),
-                edge.get(self.graph_object_direction_property, ""), edge.get(self.graph_object_aspect_property, ""),
-                "False")  # Silly to have these in strings, but that's the old format... will delete eventually
+    @staticmethod
+    def _copy_query_graph(query_graph: dict) -> dict:
+        # Only copy the parts of the QG we modify (qnode/qedge dicts and qualifiers); the rest is read-only, so it can
+        # be shared with the original QG (which we echo back in the response) rather than deep-copied on every query
+        trapi_qg = dict(query_graph)
+        trapi_qg["nodes"] = {qnode_key: dict(qnode) for qnode_key, qnode in query_graph["nodes"].items()}
+        if query_graph.get("edges"):
+            trapi_qg["edges"] = {qedge_key: dict(qedge) for qedge_key, qedge in query_graph["edges"].items()}
+            for qedge in trapi_qg["edges"].values():
+                if qedge.get("qualifier_constraints"):
+                    qedge["qualifier_constraints"] = [{**qualifier_constraint,
+                                                       "qualifier_set": [dict(qualifier) for qualifier
+                                                                         in qualifier_constraint.get("qualifier_set")]}
+                                                      for qualifier_constraint in qedge["qualifier_constraints"]]
+        return trapi_qg
 
     def get_edges(self, node_pairs: List[List[str]]) -> dict:
         """
         Finds edges between the specified node pairs. Does *not* currently do concept subclass reasoning.
         """
-        # Loop through pairs
+        # Every pair uses the same query apart from node IDs, so we only expand its categories/predicates once
         qg_template = {"nodes": {"na": {"ids": []}, "nb": {"ids": []}},
                        "edges": {"e": {"subject": "na", "object": "nb", "predicates": ["biolink:related_to"]}}}
+        output_categories_expanded, predicate_direction_masks = self._prepare_lookup("na", "nb", qg_template)
+        # Loop through pairs
         node_pairs_to_edge_ids = dict()
         all_node_ids = set()
         all_edge_ids = set()
-        logging.info(f"{self.endpoint_name}: Looking up edges for {len(node_pairs)} node pairs..")
+        logging.info("%s: Looking up edges for %s node pairs..", self.endpoint_name, len(node_pairs))
         for node_id_a, node_id_b in node_pairs:
             # Convert to equivalent identifiers we recognize
-            node_id_a_preferred = self.preferred_id_map.get(node_id_a, node_id_a)
-            node_id_b_preferred = self.preferred_id_map.get(node_id_b, node_id_b)
+            node_id_a_preferred = self._get_preferred_id(node_id_a)
+            node_id_b_preferred = self._get_preferred_id(node_id_b)
 
             # Find answers for this pair (NO SUBCLASS REASONING)
-            qg_template["nodes"]["na"]["ids"] = [node_id_a_preferred]
-            qg_template["nodes"]["nb"]["ids"] = [node_id_b_preferred]
-            input_node_ids, output_node_ids, edge_ids = self._lookup_answers("na", "nb", qg_template)
+            input_node_ids, output_node_ids, edge_ids = self._lookup_answers_in_main_index({node_id_a_preferred},
+                                                                                           {node_id_b_preferred},
+                                                                                           output_categories_expanded,
+                                                                                           predicate_direction_masks)
 
             # Record answers for this pair
             pair_key = f"{node_id_a}--{node_id_b}"
@@ -1036,104 +1616,175 @@ class PloverDB:
             all_node_ids |= input_node_ids
             all_node_ids |= output_node_ids
 
-        logging.info(f"{self.endpoint_name}: Found edges for {len(node_pairs_to_edge_ids)} node pairs.")
+        logging.info("%s: Found edges for %s node pairs.", self.endpoint_name, len(node_pairs_to_edge_ids))
 
         # Then grab all edge/node objects
         kg = {"edges": {edge_id: self._convert_edge_to_trapi_format(self.edge_lookup_map[edge_id])
                         for edge_id in all_edge_ids},
-              "nodes": {node_id: self._convert_node_to_trapi_format(self.node_lookup_map[node_id])
-                        for node_id in all_node_ids}}
+              "nodes": {node_id: self._get_trapi_node(node_id) for node_id in all_node_ids}}
 
-        logging.info(f"{self.endpoint_name}: Returning answer with {len(kg['edges'])} edges "
-                     f"and {len(kg['nodes'])} nodes.")
+        logging.info("%s: Returning answer with %s edges and %s nodes.", self.endpoint_name, len(kg["edges"]),
+                     len(kg["nodes"]))
         return {"pairs_to_edge_ids": node_pairs_to_edge_ids, "knowledge_graph": kg}
 
     def get_neighbors(self, node_ids: List[str], categories: List[str], predicates: List[str]) -> dict:
         """
         Finds neighbors for input nodes. Does *not* do subclass reasoning currently.
         """
+        # Every input node uses the same query apart from its ID, so we only expand categories/predicates once
         qg_template = {"nodes": {"n_in": {"ids": []}, "n_out": {"categories": categories}},
                        "edges": {"e": {"subject": "n_in", "object": "n_out", "predicates": predicates}}}
+        output_categories_expanded, predicate_direction_masks = self._prepare_lookup("n_in", "n_out", qg_template)
+        # The main index is laid out node by node, so if every category/predicate group matches (as with the default
+        # NamedThing/related_to), a node's neighbors are simply all of its rows and we needn't inspect its groups
+        use_all_rows = self._matches_all_main_index_groups(output_categories_expanded, predicate_direction_masks)
+        node_group_offsets = self.main_index["node_group_offsets"]
+        group_row_offsets = self.main_index["group_row_offsets"]
+        all_neighbor_int_ids = self.main_index["neighbor_int_ids"]
         neighbors_map = dict()
-        logging.info(f"{self.endpoint_name}: Looking up neighbors for {len(node_ids)} input nodes..")
+        neighbors_by_node_int_id = dict()  # Input IDs often include synonyms, so we only look up each node once
+        node_id_map = self.node_id_map
+        plover_node_ids = self.node_ids
+        logging.info("%s: Looking up neighbors for %s input nodes..", self.endpoint_name, len(node_ids))
         for node_id in node_ids:
             # Convert to the equivalent identifier we recognize
-            node_id_preferred = self.preferred_id_map.get(node_id, node_id)
+            node_int_id = node_id_map.get(self._get_preferred_id(node_id))
 
-            # Find neighbors of this node
-            qg_template["nodes"]["n_in"]["ids"] = [node_id_preferred]
-            input_node_ids, output_node_ids, edge_ids = self._lookup_answers("n_in", "n_out", qg_template)
-
-            # Record neighbors for this node
-            neighbors_map[node_id] = list(output_node_ids)
-        logging.info(f"{self.endpoint_name}: Returning neighbors map with {len(neighbors_map)} entries.")
+            # Find neighbors of this node (we only need their IDs, so we skip converting edge IDs and such)
+            if node_int_id is None:
+                neighbors_map[node_id] = []
+            elif node_int_id in neighbors_by_node_int_id:
+                neighbors_map[node_id] = neighbors_by_node_int_id[node_int_id]
+            else:
+                if use_all_rows:
+                    start = group_row_offsets[node_group_offsets[node_int_id]]
+                    end = group_row_offsets[node_group_offsets[node_int_id + 1]]
+                    neighbor_int_ids = all_neighbor_int_ids[start:end]
+                else:
+                    _, neighbor_int_ids = self._lookup_node_in_main_index(node_int_id, None, output_categories_expanded,
+                                                                          predicate_direction_masks, 0)
+                neighbors = [plover_node_ids[neighbor_int_id] for neighbor_int_id in set(neighbor_int_ids)]
+                neighbors_map[node_id] = neighbors_by_node_int_id[node_int_id] = neighbors
+        logging.info("%s: Returning neighbors map with %s entries.", self.endpoint_name, len(neighbors_map))
         return neighbors_map
 
+    def _matches_all_main_index_groups(self, output_categories_expanded: Set[int],
+                                       predicate_direction_masks: Dict[int, int]) -> bool:
+        # Note: Conglomerate predicate rows just duplicate regular predicate rows, so we needn't check those
+        return (output_categories_expanded.issuperset(self.category_map.values()) and
+                all(predicate_direction_masks.get(predicate_id) == 0b11
+                    for predicate, predicate_id in self.predicate_map.items() if "--" not in predicate))
+
     def _lookup_answers(self, input_qnode_key: str, output_qnode_key: str, trapi_qg: dict) -> Tuple[set, set, set]:
+        output_categories_expanded, predicate_direction_masks = self._prepare_lookup(input_qnode_key, output_qnode_key,
+                                                                                      trapi_qg)
+        input_curies = self._convert_to_set(trapi_qg["nodes"][input_qnode_key]["ids"])
+        output_curies = self._convert_to_set(trapi_qg["nodes"][output_qnode_key].get("ids"))
+        return self._lookup_answers_in_main_index(input_curies, output_curies, output_categories_expanded,
+                                                  predicate_direction_masks)
+
+    def _prepare_lookup(self, input_qnode_key: str, output_qnode_key: str,
+                        trapi_qg: dict) -> Tuple[Set[int], Dict[int, int]]:
         qedge = next(qedge for qedge in trapi_qg["edges"].values())
         # Convert to canonical predicates in the QG as needed
         self._force_qedge_to_canonical_predicates(qedge)
 
-        # Load the query and do any necessary transformations to categories/predicates
-        input_curies = self._convert_to_set(trapi_qg["nodes"][input_qnode_key]["ids"])
-        output_curies = self._convert_to_set(trapi_qg["nodes"][output_qnode_key].get("ids"))
+        # Do any necessary transformations to categories/predicates
         output_categories_expanded = self._get_expanded_output_category_ids(output_qnode_key, trapi_qg)
-        qedge_predicates_expanded = self._get_expanded_qedge_predicates(qedge)
-
+        # 1 means we'll look for edges recorded in 'forwards' direction, 0 means 'backwards'
+        qedge_direction = 1 if input_qnode_key == qedge["subject"] else 0
+        predicate_direction_masks = self._get_expanded_qedge_predicates(qedge, qedge_direction)
+        return output_categories_expanded, predicate_direction_masks
+
+    def _lookup_answers_in_main_index(self, input_curies: Set[str], output_curies: Set[str],
+                                      output_categories_expanded: Set[int],
+                                      predicate_direction_masks: Dict[int, int]) -> Tuple[set, set, set]:
         # Use our main index to find results to the query
         final_qedge_answers = set()
         final_input_qnode_answers = set()
         final_output_qnode_answers = set()
-        main_index = self.main_index
+        node_id_map = self.node_id_map
+        node_ids = self.node_ids
+        edge_ids = self.edge_ids
+        output_node_int_ids = {node_id_map[output_curie] for output_curie in output_curies
+                               if output_curie in node_id_map} if output_curies else None
         for input_curie in input_curies:
-            answer_edge_ids = []
-            # Stop looking for further answers if we've reached our edge limit
-            if input_curie in main_index:
-                # Consider ALL output categories if none were provided or if output curies were specified
-                categories_present = set(main_index[input_curie])
-                categories_to_inspect = output_categories_expanded.intersection(categories_present) if output_categories_expanded and not output_curies else categories_present
-                for output_category in categories_to_inspect:
-                    if output_category in main_index[input_curie]:
-                        predicates_present = set(main_index[input_curie][output_category])
-                        predicates_to_inspect = set(qedge_predicates_expanded).intersection(predicates_present)
-                        # Loop through each QG predicate (and their descendants), looking up answers as we go
-                        for predicate in predicates_to_inspect:
-                            if len(final_qedge_answers) >= self.num_edges_per_answer_cutoff:
-                                err_message = (f"Forbidden. Your query will produce more than "
-                                               f"{self.num_edges_per_answer_cutoff} answer edges. You need to make "
-                                               f"your query smaller by reducing the number of input node IDs and/or "
-                                               f"using more specific categories/predicates.")
-                                self.raise_http_error(403, err_message)
-                            else:
-                                consider_bidirectional = qedge_predicates_expanded.get(predicate)
-                                if consider_bidirectional:
-                                    directions = {0, 1}
-                                else:
-                                    # 1 means we'll look for edges recorded in 'forwards' direction, 0 means 'backwards'
-                                    directions = {1} if input_qnode_key == qedge["subject"] else {0}
-                                if output_curies:
-                                    # We need to look for the matching output node(s)
-                                    for direction in directions:
-                                        curies_present = set(main_index[input_curie][output_category][predicate][direction])
-                                        matching_output_curies = output_curies.intersection(curies_present)
-                                        for output_curie in matching_output_curies:
-                                            answer_edge_ids += list(main_index[input_curie][output_category][predicate][direction][output_curie])
-                                else:
-                                    for direction in directions:
-                                        answer_edge_ids += list(set().union(*main_index[input_curie][output_category][predicate][direction].values()))
-
+            input_node_int_id = node_id_map.get(input_curie)
+            if input_node_int_id is None:
+                continue
+            answer_edge_int_ids, answer_output_node_int_ids = self._lookup_node_in_main_index(input_node_int_id,
+                                                                                              output_node_int_ids,
+                                                                                              output_categories_expanded,
+                                                                                              predicate_direction_masks,
+                                                                                              len(final_qedge_answers))
             # Add everything we found for this input curie to our answers so far
-            for answer_edge_id in answer_edge_ids:
-                subject_curie = self.edge_lookup_map[answer_edge_id]["subject"]
-                object_curie = self.edge_lookup_map[answer_edge_id]["object"]
-                output_curie = object_curie if object_curie != input_curie else subject_curie
-                # Add this edge and its nodes to our answer KG
-                final_qedge_answers.add(answer_edge_id)
+            # (Feeding the int -> ID mapping straight into our answer sets, rather than building throwaway lists)
+            if answer_edge_int_ids:
+                final_qedge_answers.update(map(edge_ids.__getitem__, answer_edge_int_ids))
                 final_input_qnode_answers.add(input_curie)
-                final_output_qnode_answers.add(output_curie)
+                final_output_qnode_answers.update(map(node_ids.__getitem__, set(answer_output_node_int_ids)))
 
         return final_input_qnode_answers, final_output_qnode_answers, final_qedge_answers
 
+    def _lookup_node_in_main_index(self, input_node_int_id: int, output_node_int_ids: Optional[Set[int]],
+                                   output_categories_expanded: Set[int], predicate_direction_masks: Dict[int, int],
+                                   num_edges_found_so_far: int) -> Tuple[List[int], List[int]]:
+        # Returns parallel lists of answer edge int IDs and output node int IDs (any output node if none are specified)
+        node_group_offsets = self.main_index["node_group_offsets"]
+        group_category_ids = self.main_index["group_category_ids"]
+        group_predicate_ids = self.main_index["group_predicate_ids"]
+        group_directions = self.main_index["group_directions"]
+        group_row_offsets = self.main_index["group_row_offsets"]
+        neighbor_int_ids = self.main_index["neighbor_int_ids"]
+        edge_int_ids = self.main_index["edge_int_ids"]
+        # Consider ALL output categories if none were provided or if output curies were specified
+        filter_on_category = output_categories_expanded and output_node_int_ids is None
+        # Pull loop invariants out of the per-group loop
+        num_output_nodes = len(output_node_int_ids) if output_node_int_ids is not None else 0
+        num_edges_per_answer_cutoff = self.num_edges_per_answer_cutoff
+        # Note: We collect answers in parallel lists of int IDs, so whole row slices can be added at once
+        answer_edge_int_ids = []
+        answer_output_node_int_ids = []
+        # Walk this node's groups by zipping slices of the group arrays (iterating slices is much cheaper than
+        # indexing into each array once per group)
+        first_group, end_group = node_group_offsets[input_node_int_id], node_group_offsets[input_node_int_id + 1]
+        groups = zip(group_category_ids[first_group:end_group],
+                     group_predicate_ids[first_group:end_group],
+                     group_directions[first_group:end_group],
+                     group_row_offsets[first_group:end_group],
+                     group_row_offsets[first_group + 1:end_group + 1])
+        for category_id, predicate_id, direction, start, end in groups:
+            if filter_on_category and category_id not in output_categories_expanded:
+                continue
+            # Look at each QG predicate (and their descendants), considering direction as appropriate
+            if not predicate_direction_masks.get(predicate_id, 0) & (1 << direction):
+                continue
+            # Stop looking for further answers if we've reached our edge limit
+            if num_edges_found_so_far >= num_edges_per_answer_cutoff:
+                err_message = (f"Forbidden. Your query will produce more than "
+                               f"{num_edges_per_answer_cutoff} answer edges. You need to make "
+                               f"your query smaller by reducing the number of input node IDs and/or "
+                               f"using more specific categories/predicates.")
+                self.raise_http_error(403, err_message)
+            if output_node_int_ids is None:
+                answer_edge_int_ids += edge_int_ids[start:end]
+                answer_output_node_int_ids += neighbor_int_ids[start:end]
+            elif num_output_nodes < end - start:
+                # We need to look for the matching output node(s) (binary search, since group is sorted)
+                for output_node_int_id in output_node_int_ids:
+                    index = bisect.bisect_left(neighbor_int_ids, output_node_int_id, start, end)
+                    while index < end and neighbor_int_ids[index] == output_node_int_id:
+                        answer_edge_int_ids.append(edge_int_ids[index])
+                        answer_output_node_int_ids.append(output_node_int_id)
+                        index += 1
+            else:
+                # This group has fewer rows than we have output nodes, so it's cheaper to just scan it
+                for neighbor_int_id, edge_int_id in zip(neighbor_int_ids[start:end], edge_int_ids[start:end]):
+                    if neighbor_int_id in output_node_int_ids:
+                        answer_edge_int_ids.append(edge_int_id)
+                        answer_output_node_int_ids.append(neighbor_int_id)
+        return answer_edge_int_ids, answer_output_node_int_ids
+
     def _create_response_from_answer_ids(self, final_input_qnode_answers: Set[str],
                                          final_output_qnode_answers: Set[str],
                                          final_qedge_answers: Set[str],
@@ -1172,7 +1823,7 @@ class PloverDB:
             "message": {
                 "query_graph": trapi_qg,
                 "knowledge_graph": {
-                    "nodes": {node_id: self._convert_node_to_trapi_format(self.node_lookup_map[node_id])
+                    "nodes": {node_id: self._get_trapi_node(node_id)
                               for node_id in final_input_qnode_answers.union(final_output_qnode_answers)},
                     "edges": edges
                 },
@@ -1189,6 +1840,12 @@ class PloverDB:
         }
         return response
 
+    def _get_trapi_node(self, node_id: str) -> dict:
+        # Note: Returned nodes are shared between responses, so they mustn't be modified
+        return self._get_cached(self.trapi_nodes_cache, node_id,
+                                lambda: self._convert_node_to_trapi_format(self.node_lookup_map[node_id]),
+                                self.trapi_nodes_cache_size)
+
     def _convert_node_to_trapi_format(self, node_biolink: dict) -> dict:
         trapi_node = {
             "name": node_biolink.get("name"),
@@ -1200,29 +1857,39 @@ class PloverDB:
         return trapi_node
 
     def _convert_edge_to_trapi_format(self, edge_biolink: dict) -> dict:
-        if self.kg_config.get("sources_template"):
-            sources_template = copy.deepcopy(self.edge_sources)  # Need to copy because source urls change per edge
-            if edge_biolink["predicate"] in sources_template:
-                sources = sources_template[edge_biolink["predicate"]]
+        if self.edge_sources:
+            if edge_biolink["predicate"] in self.edge_sources:
+                source_shells = self.edge_sources[edge_biolink["predicate"]]
             else:
-                sources = sources_template["default"]
+                source_shells = self.edge_sources["default"]
         else:
-            # Craft sources based on primary knowledge source on edges
+            # Craft sources based on primary knowledge source on edges (there are only so many of those, so we only
+            # craft each one's sources once)
             primary_ks_id = edge_biolink["primary_knowledge_source"]
-            source_primary = {
-                "resource_id": primary_ks_id,
-                "resource_role": "primary_knowledge_source"
-            }
-            source_kp = {
-                "resource_id": self.kp_infores_curie,
-                "resource_role": "aggregator_knowledge_source",
-                "upstream_resource_ids": [primary_ks_id]
-            }
-            sources = [source_primary, source_kp]
+            source_shells = self.primary_ks_source_shells.get(primary_ks_id)
+            if source_shells is None:
+                source_primary = {
+                    "resource_id": primary_ks_id,
+                    "resource_role": "primary_knowledge_source"
+                }
+                source_kp = {
+                    "resource_id": self.kp_infores_curie,
+                    "resource_role": "aggregator_knowledge_source",
+                    "upstream_resource_ids": [primary_ks_id]
+                }
+                source_shells = [source_primary, source_kp]
+                self.primary_ks_source_shells[primary_ks_id] = source_shells
 
         if edge_biolink.get("source_record_urls"):
-            source_kp = next(source for source in sources if source["resource_id"] == self.kp_infores_curie)
-            source_kp["source_record_urls"] = edge_biolink["source_record_urls"]
+            # Source urls change per edge, but they only go on our KP's source, so that's the only shell we copy
+            kp_infores_curie = self.kp_infores_curie
+            kp_source_index = next(index for index, source_shell in enumerate(source_shells)
+                                   if source_shell["resource_id"] == kp_infores_curie)
+            sources = list(source_shells)
+            sources[kp_source_index] = dict(source_shells[kp_source_index],
+                                            source_record_urls=edge_biolink["source_record_urls"])
+        else:
+            sources = source_shells  # Note: These are shared between edges/responses, so they mustn't be modified
 
         trapi_edge = {
             "subject": edge_biolink["subject"],
@@ -1256,7 +1923,8 @@ class PloverDB:
 
     def _get_trapi_node_attribute(self, property_name: str, value: any) -> dict:
         # Just use a default attribute for any properties/attributes not yet defined in kg_config.json
-        attribute = copy.deepcopy(self.trapi_attribute_map.get(property_name, {"attribute_type_id": property_name}))
+        # Attribute shells are flat, so a shallow copy is enough (we only ever reassign top-level keys)
+        attribute = dict(self.trapi_attribute_map.get(property_name, {"attribute_type_id": property_name}))
         attribute["value"] = value
         if attribute.get("attribute_source"):
             attribute["attribute_source"] = attribute["attribute_source"].replace("{kp_infores_curie}",
@@ -1267,7 +1935,9 @@ class PloverDB:
 
     def _get_trapi_edge_attributes(self, edge_biolink: dict) -> List[dict]:
         attributes = []
-        non_core_edge_properties = set(edge_biolink.keys()).difference(self.core_edge_properties)
+        # Filter the edge's keys directly rather than building a set per edge (also keeps attributes in edge order)
+        non_core_edge_properties = [property_name for property_name in edge_biolink
+                                    if property_name not in self.core_edge_properties]
         for property_name in non_core_edge_properties:
             value = edge_biolink[property_name]
             if property_name in self.kg_config.get("zip", {}):
@@ -1293,7 +1963,8 @@ class PloverDB:
 
     def _get_trapi_edge_attribute(self, property_name: str, value: any, edge_biolink: dict) -> dict:
         # Just use a default attribute for any properties/attributes not yet defined in kg_config.json
-        attribute = copy.deepcopy(self.trapi_attribute_map.get(property_name, {"attribute_type_id": property_name}))
+        # Attribute shells are flat, so a shallow copy is enough (we only ever reassign top-level keys)
+        attribute = dict(self.trapi_attribute_map.get(property_name, {"attribute_type_id": property_name}))
         attribute["value"] = value
         if attribute.get("attribute_source"):
             source_property_name = attribute["attribute_source"].strip("{").strip("}")
@@ -1317,11 +1988,15 @@ class PloverDB:
             # First group edges that belong in the same result
             input_qnode_is_set = trapi_qg["nodes"][input_qnode_key].get("is_set")
             output_qnode_is_set = trapi_qg["nodes"][output_qnode_key].get("is_set")
-            edge_groups = defaultdict(set)
-            input_node_groups = defaultdict(set)
-            output_node_groups = defaultdict(set)
+            edge_lookup_map = self.edge_lookup_map
+            input_query_ids_map = descendant_to_query_id_map[input_qnode_key]
+            output_query_ids_map = descendant_to_query_id_map[output_qnode_key]
+            # Build each node's binding only once, since hub nodes tend to appear in many results
+            input_node_bindings = dict()
+            output_node_bindings = dict()
+            result_groups = dict()  # Maps result hash key --> (edge IDs, input node IDs, output node IDs)
             for edge_id in final_qedge_answers:
-                edge = self.edge_lookup_map[edge_id]
+                edge = edge_lookup_map[edge_id]
                 # Figure out which is the input vs. output node
                 subject_id = edge["subject"]
                 object_id = edge["object"]
@@ -1333,27 +2008,34 @@ class PloverDB:
                 output_node_hash_key = "*" if output_qnode_is_set else output_node_id
                 # Assign this edge to the result it belongs in (based on its result hash key)
                 result_hash_key = (input_node_hash_key, output_node_hash_key)
-                edge_groups[result_hash_key].add(edge_id)
-                input_node_groups[result_hash_key].add(input_node_id)
-                output_node_groups[result_hash_key].add(output_node_id)
+                result_group = result_groups.get(result_hash_key)
+                if result_group is None:
+                    result_group = result_groups[result_hash_key] = ([], set(), set())
+                result_group[0].append(edge_id)  # (Answer edge IDs are already unique)
+                result_group[1].add(input_node_id)
+                result_group[2].add(output_node_id)
+                if input_node_id not in input_node_bindings:
+                    input_node_bindings[input_node_id] = self._create_trapi_node_binding(
+                        input_node_id, input_query_ids_map.get(input_node_id))
+                if output_node_id not in output_node_bindings:
+                    output_node_bindings[output_node_id] = self._create_trapi_node_binding(
+                        output_node_id, output_query_ids_map.get(output_node_id))
 
             # Then form actual results based on our result groups
             results = []
-            for result_hash_key, edge_info_tuples in edge_groups.items():
+            for result_edge_ids, result_input_node_ids, result_output_node_ids in result_groups.values():
                 result = {
                     "node_bindings": {
-                        input_qnode_key: [self._create_trapi_node_binding(input_node_id,
-                                                                          descendant_to_query_id_map[input_qnode_key].get(input_node_id))
-                                          for input_node_id in input_node_groups[result_hash_key]],
-                        output_qnode_key: [self._create_trapi_node_binding(output_node_id,
-                                                                           descendant_to_query_id_map[output_qnode_key].get(output_node_id))
-                                           for output_node_id in output_node_groups[result_hash_key]]
+                        input_qnode_key: [input_node_bindings[input_node_id]
+                                          for input_node_id in result_input_node_ids],
+                        output_qnode_key: [output_node_bindings[output_node_id]
+                                           for output_node_id in result_output_node_ids]
                     },
                     "analyses": [
                         {
                             "edge_bindings": {
                                 qedge_key: [{"id": edge_id, "attributes": []}  # Attributes must be empty list if none
-                                            for edge_id in edge_groups[result_hash_key]]
+                                            for edge_id in result_edge_ids]
                             },
                             "resource_id": self.kp_infores_curie
                         }
@@ -1388,30 +2070,41 @@ class PloverDB:
 
     def _filter_edges_by_attribute_constraints(self, trapi_edges: Dict[str, dict],
                                                qedge_attribute_constraints: List[dict]) -> Dict[str, dict]:
-        constraints_dict = {f"{constraint['id']}--{constraint['operator']}--{constraint['value']}--{constraint.get('not')}": constraint
+        # Note: We prepare each constraint just once, rather than every time we check it against an attribute
+        constraints_dict = {f"{constraint['id']}--{constraint['operator']}--{constraint['value']}--{constraint.get('not')}":
+                                self._prepare_attribute_constraint(constraint)
                             for constraint in qedge_attribute_constraints}
         constraints_set = set(constraints_dict)
+        # Only attributes whose type could match one of our constraints are worth checking
+        relevant_attribute_ids = {constraint["id"] for constraint in constraints_dict.values()}
+        if "knowledge_source" in relevant_attribute_ids:
+            relevant_attribute_ids |= self.knowledge_source_properties
         edge_keys_to_delete = set()
         for edge_key, edge in trapi_edges.items():
             fulfilled = False
             # First try to fulfill all constraints via top-level attributes on this edge
             # Pretend that edge sources are attributes too, to allow filtering based on sources via attr constraints
             sources_attrs = [{"attribute_type_id": source["resource_role"],
-                              "value": source["resource_id"]} for source in edge["sources"]]
+                              "value": source["resource_id"]} for source in edge["sources"]
+                             if source["resource_role"] in relevant_attribute_ids]
+            top_level_attributes = [attribute for attribute in edge["attributes"]
+                                    if attribute["attribute_type_id"] in relevant_attribute_ids] + sources_attrs
             fulfilled_top = {constraint_key for constraint_key, constraint in constraints_dict.items()
                              if any(self._meets_constraint(attribute=attribute,
                                                            constraint=constraint)
-                                    for attribute in edge["attributes"] + sources_attrs)}
+                                    for attribute in top_level_attributes)}
 
             # If any constraints remain unfulfilled, see if we can fulfill them using subattributes
             remaining_constraints = constraints_set.difference(fulfilled_top)
             if remaining_constraints:
                 # NOTE: All remaining constraints must be fulfilled by subattributes on the *same* attribute to count
                 for attribute in edge["attributes"]:
+                    subattributes = [subattribute for subattribute in attribute.get("attributes", [])
+                                     if subattribute["attribute_type_id"] in relevant_attribute_ids]
                     fulfilled_nested = {constraint_key for constraint_key in remaining_constraints
                                         if any(self._meets_constraint(attribute=subattribute,
                                                                       constraint=constraints_dict[constraint_key])
-                                               for subattribute in attribute.get("attributes", []))}
+                                               for subattribute in subattributes)}
                     if fulfilled_nested == remaining_constraints:
                         fulfilled = True
                         break  # Don't need to check remaining attributes on this edge
@@ -1429,7 +2122,27 @@ class PloverDB:
                 del trapi_edges[edge_key]
         return trapi_edges
 
+    def _prepare_attribute_constraint(self, constraint: dict) -> dict:
+        # Do any data type conversions on the constraint's value up front (including converting clinical trial phase
+        # enums to numbers, for easier comparison)
+        constraint_value = constraint["value"]
+        try:
+            if isinstance(constraint_value, list):
+                constraint_value = [self._load_value(self.trial_phases_map_reversed.get(val, val))
+                                    for val in constraint_value]
+            else:
+                constraint_value = self._load_value(self.trial_phases_map_reversed.get(constraint_value,
+                                                                                       constraint_value))
+        except TypeError:
+            constraint_value = constraint["value"]  # Leave unhashable (e.g., object) values as they are
+        if constraint["operator"] not in {"==", "<", ">", "<=", ">=", "==="}:
+            log_message = (f"Encountered unsupported operator: {constraint['operator']}. Don't know how to handle; "
+                           f"will ignore this constraint.")
+            self.log_trapi("WARNING", log_message)
+        return {**constraint, "value": constraint_value}
+
     def _meets_constraint(self, attribute: dict, constraint: dict) -> bool:
+        # Note: Expects a constraint that's been through _prepare_attribute_constraint()
         # Make sure we have compatible attribute/constraint IDs
         constraint_id = constraint["id"]
         attribute_id = attribute["attribute_type_id"]
@@ -1451,12 +2164,6 @@ class PloverDB:
             attribute_value = [self.trial_phases_map_reversed.get(val, val) for val in attribute_value]
         else:
             attribute_value = self.trial_phases_map_reversed.get(attribute_value, attribute_value)
-        if constraint_val_is_list:
-            constraint_value = [self.trial_phases_map_reversed.get(val, val) for val in constraint_value]
-            constraint_value = [self._load_value(val) for val in constraint_value]
-        else:
-            constraint_value = self.trial_phases_map_reversed.get(constraint_value, constraint_value)
-            constraint_value = self._load_value(constraint_value)
 
         try:
             # TODO: Add 'matches'?
@@ -1464,69 +2171,80 @@ class PloverDB:
             # Now figure out whether the attribute meets the constraint, ignoring the 'not' property on the constraint
             if operator == "==":
                 if attribute_val_is_list and constraint_val_is_list:
-                    meets_constraint = set(attribute_value).intersection(set(constraint_value)) != set()
+                    meets_constraint = not set(attribute_value).isdisjoint(constraint_value)
                 elif attribute_val_is_list:
                     meets_constraint = constraint_value in attribute_value
                 elif constraint_val_is_list:
                     meets_constraint = attribute_value in constraint_value
                 else:
                     meets_constraint = attribute_value == constraint_value
-            elif operator == "<":
-                if attribute_val_is_list and constraint_val_is_list:
-                    meets_constraint = any(attribute_val < constraint_val for attribute_val in attribute_value
-                                           for constraint_val in constraint_value)
-                elif attribute_val_is_list:
-                    meets_constraint = any(attribute_val < constraint_value for attribute_val in attribute_value)
-                elif constraint_val_is_list:
-                    meets_constraint = any(attribute_value < constraint_val for constraint_val in constraint_value)
+            elif operator in ORDERING_OPERATORS:
+                if attribute_val_is_list or constraint_val_is_list:
+                    meets_constraint = self._meets_ordering_constraint(
+                        attribute_value if attribute_val_is_list else [attribute_value],
+                        constraint_value if constraint_val_is_list else [constraint_value],
+                        operator)
                 else:
-                    meets_constraint = attribute_value < constraint_value
-            elif operator == ">":
-                if attribute_val_is_list and constraint_val_is_list:
-                    meets_constraint = any(attribute_val > constraint_val for attribute_val in attribute_value
-                                           for constraint_val in constraint_value)
-                elif attribute_val_is_list:
-                    meets_constraint = any(attribute_val > constraint_value for attribute_val in attribute_value)
-                elif constraint_val_is_list:
-                    meets_constraint = any(attribute_value > constraint_val for constraint_val in constraint_value)
-                else:
-                    meets_constraint = attribute_value > constraint_value
-            elif operator == "<=":
-                if attribute_val_is_list and constraint_val_is_list:
-                    meets_constraint = any(attribute_val <= constraint_val for attribute_val in attribute_value
-                                           for constraint_val in constraint_value)
-                elif attribute_val_is_list:
-                    meets_constraint = any(attribute_val <= constraint_value for attribute_val in attribute_value)
-                elif constraint_val_is_list:
-                    meets_constraint = any(attribute_value <= constraint_val for constraint_val in constraint_value)
-                else:
-                    meets_constraint = attribute_value <= constraint_value
-            elif operator == ">=":
-                if attribute_val_is_list and constraint_val_is_list:
-                    meets_constraint = any(attribute_val >= constraint_val for attribute_val in attribute_value
-                                           for constraint_val in constraint_value)
-                elif attribute_val_is_list:
-                    meets_constraint = any(attribute_val >= constraint_value for attribute_val in attribute_value)
-                elif constraint_val_is_list:
-                    meets_constraint = any(attribute_value >= constraint_val for constraint_val in constraint_value)
-                else:
-                    meets_constraint = attribute_value >= constraint_value
+                    meets_constraint = ORDERING_OPERATORS[operator](attribute_value, constraint_value)
             elif operator == "===":
                 meets_constraint = attribute_value == constraint_value
-            else:
-                log_message = (f"Encountered unsupported operator: {operator}. Don't know how to handle; "
-                               f"will ignore this constraint.")
-                self.log_trapi("WARNING", log_message)
+            # (Otherwise this is an unsupported operator, which we ignore; we warned about it when preparing)
         except Exception:
             return False
 
         # Now factor in the 'not' property on the constraint
         return not meets_constraint if is_not else meets_constraint
 
+    @staticmethod
+    def _meets_ordering_constraint(attribute_values: list, constraint_values: list, operator: str) -> bool:
+        # Determines whether any attribute value/constraint value pair satisfies the comparison; only the extremes
+        # matter for that (e.g., some attribute value < some constraint value iff min(attribute) < max(constraint)),
+        # so we don't need to compare every pair
+        compare = ORDERING_OPERATORS[operator]
+        if not attribute_values or not constraint_values:
+            return False
+        try:
+            if operator in ("<", "<="):
+                return compare(min(attribute_values), max(constraint_values))
+            else:
+                return compare(max(attribute_values), min(constraint_values))
+        except TypeError:
+            # Values of mixed types can't all be ordered against each other, so fall back to comparing pairwise
+            return any(compare(attribute_value, constraint_value) for attribute_value in attribute_values
+                       for constraint_value in constraint_values)
+
+    def _expand_qnode_ids_to_descendants(self, qnode: dict, descendant_to_query_id_map: Dict[str, Set[str]]):
+        query_curies = set(qnode["ids"])
+        curies_with_descendants = set(query_curies)
+        for query_curie in query_curies:
+            # Note: The subclass index only holds proper descendants, and query curies are already accounted for
+            proper_descendants = self._get_proper_descendants(query_curie)
+            if proper_descendants:
+                curies_with_descendants.update(proper_descendants)
+                # We only want to record the mapping in the case of a true descendant (a node is never its own proper
+                # descendant, so we only need to filter out other query curies when there are multiple)
+                if len(query_curies) > 1:
+                    proper_descendants = [descendant for descendant in proper_descendants
+                                          if descendant not in query_curies]
+                for descendant in proper_descendants:
+                    descendant_to_query_id_map[descendant].add(query_curie)
+        qnode["ids"] = list(curies_with_descendants)
+
+    def _get_proper_descendants(self, node_id: str) -> List[str]:
+        node_int_id = self.node_id_map.get(node_id)
+        if node_int_id is None:
+            return []
+        descendant_offsets = self.subclass_index["descendant_offsets"]
+        start, end = descendant_offsets[node_int_id], descendant_offsets[node_int_id + 1]
+        if start == end:  # Most nodes have no descendants
+            return []
+        node_ids = self.node_ids
+        return [node_ids[descendant_int_id] for descendant_int_id in self.subclass_index["descendant_int_ids"][start:end]]
+
     def _get_descendants(self, node_ids: Union[List[str], str]) -> List[str]:
         node_ids = self._convert_to_set(node_ids)
         proper_descendants = {descendant_id for node_id in node_ids
-                              for descendant_id in self.subclass_index.get(node_id, set())}
+                              for descendant_id in self._get_proper_descendants(node_id)}
         descendants = proper_descendants.union(node_ids)
         return list(descendants)
 
@@ -1543,7 +2261,25 @@ class PloverDB:
         return qnode_key_with_most_curies
 
     def _get_expanded_output_category_ids(self, output_qnode_key: str, trapi_qg: dict) -> Set[int]:
-        output_category_names_raw = self._convert_to_set(trapi_qg["nodes"][output_qnode_key].get("categories"))
+        output_category_names_raw = frozenset(self._convert_to_set(trapi_qg["nodes"][output_qnode_key].get("categories")))
+        return self._get_cached(self.expanded_category_ids_cache, output_category_names_raw,
+                                lambda: self._expand_output_category_names(output_category_names_raw),
+                                self.expansion_cache_size)
+
+    @staticmethod
+    def _get_cached(cache: OrderedDict, cache_key: Hashable, compute: Callable[[], any], max_cache_size: int) -> any:
+        # What we cache only depends on the Biolink model and our (fixed) indexes, so it can't go stale; we just evict
+        # the least recently used items when full. Note: Callers mustn't modify the (shared) items they get back.
+        if cache_key in cache:
+            cache.move_to_end(cache_key)
+            return cache[cache_key]
+        item = compute()
+        cache[cache_key] = item
+        if len(cache) > max_cache_size:
+            cache.popitem(last=False)
+        return item
+
+    def _expand_output_category_names(self, output_category_names_raw: FrozenSet[str]) -> Set[int]:
         output_category_names_raw = {self.bh.get_root_category()} if not output_category_names_raw else output_category_names_raw
         output_category_names = self.bh.replace_mixins_with_direct_mappings(output_category_names_raw)
         output_categories_with_descendants = self.bh.get_descendants(output_category_names, include_mixins=False)
@@ -1619,15 +2355,37 @@ class PloverDB:
                     qualified_predicates.add(qualifier["qualifier_value"])
         return qualified_predicates
 
-    def _get_expanded_qedge_predicates(self, qedge: dict) -> Dict[str, bool]:
+    def _get_expanded_qedge_predicates(self, qedge: dict, qedge_direction: int) -> Dict[int, int]:
         """
         This function returns a qedge's "conglomerate" predicates for qualified qedges (where the qualified info is kind
         of flattened or conglomerated into one derived predicate string), or its regular predicates when no qualified
-        info is available. It also returns descendants of the predicates/conglomerate predicates.
+        info is available. It also returns descendants of the predicates/conglomerate predicates. Each predicate is
+        mapped to a bitmask of the main index directions its edges may be recorded in (bit 1 << direction).
         """
         # Use 'conglomerate' predicates if the query has any qualifier constraints
-        if qedge.get("qualifier_constraints"):
-            qedge_conglomerate_predicates = self._get_conglomerate_predicates_from_qedge(qedge)
+        use_conglomerate_predicates = bool(qedge.get("qualifier_constraints"))
+        if use_conglomerate_predicates:
+            qedge_predicates_raw = frozenset(self._get_conglomerate_predicates_from_qedge(qedge))
+        else:
+            qedge_predicates_raw = frozenset(self._convert_to_set(qedge.get("predicates")))
+        return self._get_cached(self.expanded_qedge_predicates_cache,
+                                (use_conglomerate_predicates, qedge_predicates_raw, qedge_direction),
+                                lambda: self._get_predicate_direction_masks(
+                                    self._expand_qedge_predicates(qedge_predicates_raw, use_conglomerate_predicates),
+                                    qedge_direction),
+                                self.expansion_cache_size)
+
+    @staticmethod
+    def _get_predicate_direction_masks(qedge_predicates_expanded: Dict[int, bool],
+                                       qedge_direction: int) -> Dict[int, int]:
+        # Working out the allowed directions once per predicate means checking a row group is a single bit test
+        return {predicate_id: 0b11 if consider_bidirectional else 1 << qedge_direction
+                for predicate_id, consider_bidirectional in qedge_predicates_expanded.items()}
+
+    def _expand_qedge_predicates(self, qedge_predicates_raw: FrozenSet[str],
+                                 use_conglomerate_predicates: bool) -> Dict[int, bool]:
+        if use_conglomerate_predicates:
+            qedge_conglomerate_predicates = qedge_predicates_raw
             # Now find all descendant versions of our conglomerate predicates (pre-computed during index-building)
             qedge_conglomerate_predicates_expanded = {descendant for conglomerate_predicate in qedge_conglomerate_predicates
                                                       for descendant in self.conglomerate_predicate_descendant_index.get(conglomerate_predicate, set())}
@@ -1635,7 +2393,6 @@ class PloverDB:
             qedge_predicates_expanded = qedge_conglomerate_predicates_expanded
         # Otherwise we'll use the regular predicates if no qualified predicates were given
         else:
-            qedge_predicates_raw = self._convert_to_set(qedge.get("predicates"))
             qedge_predicates_raw = {self.bh.get_root_predicate()} if not qedge_predicates_raw else qedge_predicates_raw
             # Include both proper and mixin predicates, but also map mixins to their proper predicates (if any exist)
             qedge_predicates_proper = self.bh.replace_mixins_with_direct_mappings(qedge_predicates_raw)
@@ -1701,7 +2458,7 @@ class PloverDB:
                     if descendant not in qnode_ids_set:
                         descendant_to_query_id_map[qnode_key][descendant].add(query_curie)
                 input_curies += descendants
-        found_curies = set(input_curies).intersection(set(self.node_lookup_map))
+        found_curies = self.node_lookup_map.keys() & input_curies  # (Avoids building a set of every node ID)
         response = self._create_response_from_answer_ids(final_input_qnode_answers=found_curies,
                                                          final_output_qnode_answers=set(),
                                                          final_qedge_answers=set(),
@@ -1716,6 +2473,19 @@ class PloverDB:
 
     # ----------------------------------------- GENERAL HELPER METHODS ---------------------------------------------- #
 
+    def _get_preferred_id(self, node_id: str) -> str:
+        # Look the ID up in our hash table; IDs we have no record of are considered their own preferred ID
+        equiv_id_bytes = self.preferred_id_index["equiv_id_bytes"]
+        equiv_id_offsets = self.preferred_id_index["equiv_id_offsets"]
+        bucket_offsets = self.preferred_id_index["bucket_offsets"]
+        node_id_encoded = node_id.encode()
+        bucket = zlib.crc32(node_id_encoded) % (len(bucket_offsets) - 1)
+        bucket_positions = self.preferred_id_index["bucket_equiv_id_positions"][bucket_offsets[bucket]:bucket_offsets[bucket + 1]]
+        for position in bucket_positions:
+            if equiv_id_bytes[equiv_id_offsets[position]:equiv_id_offsets[position + 1]] == node_id_encoded:
+                return self.node_ids[self.preferred_id_index["preferred_node_int_ids"][position]]
+        return node_id
+
     def _get_file_names_to_use_unzipped(self) -> Tuple[str, str]:
         nodes_file = self.kg_config["nodes_file"]
         nodes_file_name = nodes_file.split("/")[-1] if self._is_url(nodes_file) else nodes_file
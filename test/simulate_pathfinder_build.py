@@ -6,11 +6,11 @@ Example: python simulate_pathfinder_build.py https://kg2cplover.rtx.ai:9990 kg2c
 """
 
 import argparse
+import json
 import time
 from collections import Counter
 from typing import Set, Tuple, List
 
-import jsonlines
 import requests
 
 
@@ -44,8 +44,8 @@ def main():
     start = time.time()
 
     print(f"Loading all node IDs from {args.nodes_jsonl_file}..")
-    with jsonlines.open(args.nodes_jsonl_file) as reader:
-        node_ids = [row["id"] for row in reader]
+    with open(args.nodes_jsonl_file) as nodes_file:
+        node_ids = [json.loads(line)["id"] for line in nodes_file if line.strip()]
     print(f"Nodes file ({args.nodes_jsonl_file}) contains {len(node_ids)} nodes")
 
     node_id_batches = split_into_chunks(node_ids, 100)
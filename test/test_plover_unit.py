@@ -0,0 +1,254 @@
+"""
+Unit tests for PloverDB's internal helpers (these don't need a running Plover service).
+Usage: pytest -v test_plover_unit.py
+"""
+import os
+import random
+import sys
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple
+
+import pytest
+
+sys.path.append(f"{os.path.dirname(os.path.abspath(__file__))}/../app/app")
+from plover import PloverDB, ORDERING_OPERATORS
+
+
+def _get_descendants_brute_force(parent_to_child_map: Dict[int, Set[int]]) -> Dict[int, Set[int]]:
+    # Plain BFS from every node; a node is never its own descendant (even if it's in a cycle)
+    descendants_map = dict()
+    for start_node in parent_to_child_map:
+        reached = set()
+        queue = list(parent_to_child_map[start_node])
+        while queue:
+            node = queue.pop()
+            if node not in reached:
+                reached.add(node)
+                queue.extend(parent_to_child_map.get(node, ()))
+        reached.discard(start_node)
+        if reached:
+            descendants_map[start_node] = reached
+    return descendants_map
+
+
+def _get_random_graph(seed: int, num_nodes: int, num_edges: int) -> Dict[int, Set[int]]:
+    rng = random.Random(seed)
+    parent_to_child_map = dict()
+    for _ in range(num_edges):
+        parent_to_child_map.setdefault(rng.randrange(num_nodes), set()).add(rng.randrange(num_nodes))
+    return parent_to_child_map
+
+
+def test_descendants_diamond():
+    # 1 --> {2, 3} --> 4 --> 5
+    parent_to_child_map = {1: {2, 3}, 2: {4}, 3: {4}, 4: {5}}
+    descendants_map, problem_nodes = PloverDB._get_all_descendants(parent_to_child_map)
+    assert descendants_map == {1: {2, 3, 4, 5}, 2: {4, 5}, 3: {4, 5}, 4: {5}}
+    assert descendants_map[2] is descendants_map[3]  # Identical descendant sets should be shared
+    assert not problem_nodes
+
+
+def test_descendants_cycles():
+    # 1 <--> 2 form a cycle under 0, 3 --> 4 --> 5 --> 3 forms another one below it, and 6 points to itself
+    parent_to_child_map = {0: {1}, 1: {2}, 2: {1, 3}, 3: {4}, 4: {5}, 5: {3, 7}, 6: {6}}
+    descendants_map, problem_nodes = PloverDB._get_all_descendants(parent_to_child_map)
+    assert descendants_map == {0: {1, 2, 3, 4, 5, 7}, 1: {2, 3, 4, 5, 7}, 2: {1, 3, 4, 5, 7},
+                               3: {4, 5, 7}, 4: {3, 5, 7}, 5: {3, 4, 7}}
+    assert problem_nodes == {1, 2, 3, 4, 5}
+
+
+def test_descendants_cutoff():
+    # 1 --> 2 --> 3 --> 4, plus a cycle (5 <--> 6) whose members each have two descendants
+    parent_to_child_map = {1: {2}, 2: {3}, 3: {4}, 5: {6}, 6: {5, 4}}
+    descendants_map, _ = PloverDB._get_all_descendants(parent_to_child_map, max_descendants=2)
+    assert descendants_map == {1: None, 2: {3, 4}, 3: {4}, 5: {4, 6}, 6: {4, 5}}
+    descendants_map, _ = PloverDB._get_all_descendants(parent_to_child_map, max_descendants=1)
+    assert descendants_map == {1: None, 2: None, 3: {4}, 5: None, 6: None}
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_descendants_match_brute_force(seed: int):
+    parent_to_child_map = _get_random_graph(seed, num_nodes=60, num_edges=random.Random(seed).randrange(20, 150))
+    expected_map = _get_descendants_brute_force(parent_to_child_map)
+    expected_problem_nodes = {node for node, descendants in expected_map.items()
+                              if any(node in expected_map.get(descendant, ()) for descendant in descendants)}
+    descendants_map, problem_nodes = PloverDB._get_all_descendants(parent_to_child_map)
+    assert descendants_map == expected_map
+    assert problem_nodes == expected_problem_nodes
+    # Nodes with too many descendants (and thus all of their ancestors) should be cut off
+    max_descendants = 10
+    descendants_map, _ = PloverDB._get_all_descendants(parent_to_child_map, max_descendants=max_descendants)
+    assert descendants_map == {node: descendants if len(descendants) <= max_descendants else None
+                               for node, descendants in expected_map.items()}
+
+
+def _get_bare_plover(node_ids: List[str]) -> PloverDB:
+    # Skips __init__ (which needs a KG config file); we only set up what the index methods under test use
+    plover = PloverDB.__new__(PloverDB)
+    plover.node_ids = node_ids
+    plover.node_id_map = {node_id: node_int_id for node_int_id, node_id in enumerate(node_ids)}
+    plover.num_edges_per_answer_cutoff = 1000000
+    return plover
+
+
+def _get_random_kg(seed: int, num_nodes: int, num_edges: int) -> Tuple[List[str], List[Tuple[int, ...]],
+                                                                         List[Tuple[int, int, int]]]:
+    # Returns node IDs, each node's category IDs, and (subject, predicate ID, object) edges (by node int ID)
+    rng = random.Random(seed)
+    node_ids = [f"TEST:{node_int_id}" for node_int_id in range(num_nodes)]
+    node_category_ids = [tuple(rng.sample(range(3), rng.randint(1, 2))) for _ in node_ids]
+    edges = [(rng.randrange(num_nodes), rng.randrange(4), rng.randrange(num_nodes)) for _ in range(num_edges)]
+    edges.append(edges[0])  # Include a duplicate edge
+    return node_ids, node_category_ids, edges
+
+
+def test_arrays_file_round_trip(tmp_path):
+    arrays = {"offsets": array("q", [0, 3, 2 ** 40]),
+              "empty": array("i"),
+              "bytes": array("B", b"abcde"),  # Odd length, so the next array needs padding to stay aligned
+              "flags": array("b", [1, 0, -1]),
+              "ids": array("i", [5, -7, 2 ** 31 - 1])}
+    int_id_counts = {"num_node_ids": 3, "num_edge_ids": 5}
+    PloverDB._save_arrays_file(arrays, f"{tmp_path}/arrays.bin", int_id_counts)
+    loaded_arrays = PloverDB._load_arrays_file(f"{tmp_path}/arrays.bin", int_id_counts)
+    assert set(loaded_arrays) == set(arrays)
+    for array_name, int_array in arrays.items():
+        assert loaded_arrays[array_name].format == int_array.typecode
+        assert loaded_arrays[array_name].tolist() == int_array.tolist()
+
+
+def test_arrays_file_from_different_build(tmp_path):
+    PloverDB._save_arrays_file({"ids": array("i", [1, 2])}, f"{tmp_path}/arrays.bin", {"num_node_ids": 3})
+    with pytest.raises(ValueError):
+        PloverDB._load_arrays_file(f"{tmp_path}/arrays.bin", {"num_node_ids": 4})
+    with pytest.raises(ValueError):
+        PloverDB._load_arrays_file(f"{tmp_path}/arrays.bin", {"num_node_ids": 3, "num_edge_ids": 0})
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_main_index_matches_dict_lookup(tmp_path, seed: int):
+    num_nodes = 40
+    node_ids, node_category_ids, edges = _get_random_kg(seed, num_nodes, num_edges=150)
+    node_ids.append("TEST:no_edges")  # A node with no rows at all
+    node_category_ids.append((0,))
+    plover = _get_bare_plover(node_ids)
+    # Accumulate rows the same way build_indexes() does, then freeze, save, and memory-map them
+    plover.main_index = defaultdict(lambda: array("i"))
+    for edge_int_id, (subject_int_id, predicate_id, object_int_id) in enumerate(edges):
+        plover.main_index[subject_int_id].extend((predicate_id, 1, object_int_id, edge_int_id))
+        plover.main_index[object_int_id].extend((predicate_id, 0, subject_int_id, edge_int_id))
+    plover._freeze_main_index(node_category_ids)
+    int_id_counts = {"num_node_ids": len(node_ids), "num_edge_ids": len(edges)}
+    plover._save_arrays_file(plover.main_index, f"{tmp_path}/main_index.bin", int_id_counts)
+    plover.main_index = plover._load_arrays_file(f"{tmp_path}/main_index.bin", int_id_counts)
+
+    rng = random.Random(seed)
+    for _ in range(200):
+        input_node_int_id = rng.randrange(len(node_ids))
+        output_category_ids = set(rng.sample(range(3), rng.randint(1, 3)))
+        output_node_int_ids = set(rng.sample(range(num_nodes), rng.choice([1, 3, 20]))) if rng.random() < 0.4 else None
+        qedge_direction = rng.choice([0, 1])
+        predicate_direction_masks = PloverDB._get_predicate_direction_masks({predicate_id: rng.random() < 0.5
+                                                                             for predicate_id in rng.sample(range(4), 2)},
+                                                                            qedge_direction)
+        # Work out the answers straight from the edge list
+        expected_answers = set()
+        for edge_int_id, (subject_int_id, predicate_id, object_int_id) in enumerate(edges):
+            for direction, node_int_id, neighbor_int_id in [(1, subject_int_id, object_int_id),
+                                                            (0, object_int_id, subject_int_id)]:
+                if node_int_id == input_node_int_id and predicate_direction_masks.get(predicate_id, 0) & (1 << direction):
+                    if output_node_int_ids is not None:
+                        if neighbor_int_id in output_node_int_ids:  # (Categories don't matter if output nodes are given)
+                            expected_answers.add((edge_int_id, neighbor_int_id))
+                    elif output_category_ids.intersection(node_category_ids[neighbor_int_id]):
+                        expected_answers.add((edge_int_id, neighbor_int_id))
+
+        answer_edge_int_ids, answer_output_node_int_ids = plover._lookup_node_in_main_index(input_node_int_id,
+                                                                                            output_node_int_ids,
+                                                                                            output_category_ids,
+                                                                                            predicate_direction_masks,
+                                                                                            0)
+        assert set(zip(answer_edge_int_ids, answer_output_node_int_ids)) == expected_answers
+
+
+def test_preferred_id_index_matches_dict_lookup(tmp_path):
+    node_ids = [f"TEST:{node_int_id}" for node_int_id in range(50)]
+    plover = _get_bare_plover(node_ids)
+    plover.preferred_id_map = {node_id: node_id for node_id in node_ids}
+    for node_int_id in range(0, 50, 3):
+        plover.preferred_id_map[f"ALT:{node_int_id}"] = node_ids[node_int_id]
+        plover.preferred_id_map[f"ALT_é:{node_int_id}"] = node_ids[node_int_id]  # Non-ASCII, to check byte handling
+    int_id_counts = {"num_node_ids": len(node_ids)}
+    plover._save_arrays_file(plover._build_preferred_id_index(), f"{tmp_path}/preferred_id_index.bin", int_id_counts)
+    plover.preferred_id_index = plover._load_arrays_file(f"{tmp_path}/preferred_id_index.bin", int_id_counts)
+
+    for equiv_id, preferred_id in plover.preferred_id_map.items():
+        assert plover._get_preferred_id(equiv_id) == preferred_id
+    # IDs we have no record of are their own preferred ID
+    for unknown_id in ["ALT:1", "TEST:500", "", "TEST:1 "]:
+        assert plover._get_preferred_id(unknown_id) == unknown_id
+
+
+def test_subclass_index_matches_dict_lookup(tmp_path):
+    parent_to_child_map = _get_random_graph(seed=3, num_nodes=60, num_edges=80)
+    node_ids = [f"TEST:{node_int_id}" for node_int_id in range(60)]
+    plover = _get_bare_plover(node_ids)
+    plover.subclass_index, _ = PloverDB._get_all_descendants(parent_to_child_map)
+    expected_map = {node_ids[node_int_id]: {node_ids[descendant_int_id] for descendant_int_id in descendants}
+                    for node_int_id, descendants in plover.subclass_index.items()}
+    plover._freeze_subclass_index()
+    int_id_counts = {"num_node_ids": len(node_ids)}
+    plover._save_arrays_file(plover.subclass_index, f"{tmp_path}/subclass_index.bin", int_id_counts)
+    plover.subclass_index = plover._load_arrays_file(f"{tmp_path}/subclass_index.bin", int_id_counts)
+
+    assert any(node_id not in expected_map for node_id in node_ids)  # Make sure some nodes have no descendants
+    for node_id in node_ids:
+        proper_descendants = plover._get_proper_descendants(node_id)
+        assert len(proper_descendants) == len(set(proper_descendants))
+        assert set(proper_descendants) == expected_map.get(node_id, set())
+    assert plover._get_proper_descendants("TEST:500") == []
+
+
+def _meets_ordering_constraint_pairwise(attribute_values: list, constraint_values: list, operator: str) -> bool:
+    compare = ORDERING_OPERATORS[operator]
+    return any(compare(attribute_value, constraint_value) for attribute_value in attribute_values
+               for constraint_value in constraint_values)
+
+
+def _get_outcome(function: Callable, *args) -> any:
+    # Values that can't be ordered against each other raise TypeError (which _meets_constraint() treats as a failure)
+    try:
+        return function(*args)
+    except TypeError:
+        return TypeError
+
+
+@pytest.mark.parametrize("operator", ORDERING_OPERATORS)
+@pytest.mark.parametrize("attribute_values, constraint_values", [
+    ([1, 5, 3], [2]),
+    ([1], [1]),
+    ([2.5, 7], [3, 10]),
+    ([True, 2], [1.5]),
+    (["b", "a"], ["a"]),
+    ([], [1]),
+    ([1], []),
+    ([], []),
+    ([1, "a"], [0]),  # Mixed types: min()/max() raise, so these use the pairwise fallback
+    ([1, "a"], ["b"]),
+    ([3], [1, "z"]),
+    (["a"], [1]),
+])
+def test_meets_ordering_constraint(attribute_values: list, constraint_values: list, operator: str):
+    assert _get_outcome(PloverDB._meets_ordering_constraint, attribute_values, constraint_values, operator) == \
+           _get_outcome(_meets_ordering_constraint_pairwise, attribute_values, constraint_values, operator)
+
+
+def test_meets_ordering_constraint_matches_pairwise():
+    rng = random.Random(0)
+    for _ in range(500):
+        attribute_values = [rng.randrange(10) for _ in range(rng.randrange(4))]
+        constraint_values = [rng.randrange(10) for _ in range(rng.randrange(4))]
+        for operator in ORDERING_OPERATORS:
+            assert PloverDB._meets_ordering_constraint(attribute_values, constraint_values, operator) == \
+                   _meets_ordering_constraint_pairwise(attribute_values, constraint_values, operator)